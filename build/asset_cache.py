@@ -0,0 +1,94 @@
+"""
+On-disk cache for processed images and other derived assets.
+
+Decoding a PNG and LANCZOS-resizing it is the slow part of startup. The
+result is stored as raw pixels, keyed by the source path, its mtime and
+size, and the target size/mode, so editing or replacing an asset
+invalidates it automatically. Loading a hit is a plain file read.
+
+The cache lives in LIMBO_CACHE_DIR if set, else the per-user cache folder.
+Any problem writing to it just means the next launch recomputes.
+"""
+import hashlib, logging, os, tempfile
+from PIL import Image
+
+log = logging.getLogger(__name__)
+
+try:
+    LANCZOS = Image.Resampling.LANCZOS
+except AttributeError:
+    LANCZOS = Image.LANCZOS
+
+hits = 0
+misses = 0
+
+
+def cache_dir():
+    path = os.environ.get("LIMBO_CACHE_DIR")
+    if not path:
+        base = (os.environ.get("LOCALAPPDATA")
+                or os.environ.get("XDG_CACHE_HOME")
+                or os.path.join(os.path.expanduser("~"), ".cache"))
+        path = os.path.join(base, "LimboWindows")
+    return path
+
+
+def _entry(src, size, mode):
+    st = os.stat(src)
+    key = f"{os.path.abspath(src)}|{st.st_mtime_ns}|{st.st_size}|{size}|{mode}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(cache_dir(), f"{stem}-{digest}.{mode.lower()}")
+
+
+def load_image(src, size=None, mode="RGBA"):
+    """
+    `src` converted to `mode` and, if `size` is given, LANCZOS-resized to
+    (width, height) — from the cache when possible.
+    """
+    global hits, misses
+    path = _entry(src, size, mode)
+    try:
+        with open(path, "rb") as f:
+            w, h = (int(v) for v in f.readline().split())
+            img = Image.frombytes(mode, (w, h), f.read())
+        hits += 1
+        return img
+    except (OSError, ValueError):
+        pass
+
+    misses += 1
+    img = Image.open(src).convert(mode)
+    if size is not None and img.size != tuple(size):
+        img = img.resize(tuple(size), resample=LANCZOS)
+    _store(path, img)
+    return img
+
+
+def _store(path, img):
+    store_bytes(path, f"{img.size[0]} {img.size[1]}\n".encode() + img.tobytes())
+
+
+def store_bytes(path, data):
+    """
+    Write `data` to the cache file `path`. It is written to a temporary
+    file and renamed into place, so a half-written entry is never picked
+    up; on any error the temporary file is removed. Returns False if
+    nothing was written.
+    """
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        log.debug("cache entry not written (%s): %s", path, e)
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        return False
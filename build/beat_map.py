@@ -0,0 +1,388 @@
+"""
+Beat map for the level music: decode → onset/beat analysis → cached
+index → moves on the beat.
+
+Decoding streams the file in chunks on a background thread and the
+analysis only keeps a small energy envelope, so neither the Tk loop nor
+memory notice a long track. The result is stored in the asset cache
+folder keyed by the SHA-1 of the audio file, so it is worked out once
+per asset; later launches only hash the file and read a few KiB.
+
+At runtime BeatScheduler only looks beats up (bisect) — no analysis.
+Decoding needs the optional `miniaudio` package; without it there is no
+beat map and game() keeps chaining moves back to back. Playing the music
+is not this module's job.
+
+    beats = beat_map.load("limbo_music_audio.mp3")
+    BeatScheduler(MovementsManager(mgr), beats).start(move_ids)
+"""
+import bisect, hashlib, logging, math, os, queue, struct, sys, threading
+from array import array
+
+import asset_cache
+import windowMove
+
+try:
+    import miniaudio
+except ImportError:     # no decoder: no beat map
+    miniaudio = None
+
+log = logging.getLogger(__name__)
+
+SAMPLE_RATE = 22050
+HOP = 512               # samples per analysis frame (~23 ms)
+VERSION = 2             # bump when the analysis changes: old caches are ignored
+MAGIC = b"LBM%d" % VERSION
+
+
+class StreamDecoder:
+    """
+    Decodes an audio file to mono 16-bit chunks on a background thread.
+    Chunks are handed over through a bounded queue, so at most `maxsize`
+    of them are in memory; iterate over the decoder to consume them.
+    `source` (any iterable of sample sequences) stands in for the file,
+    e.g. a synthetic click track.
+    """
+    _END = object()
+
+    def __init__(self, path=None, sample_rate=SAMPLE_RATE, chunk=HOP * 64,
+                 source=None, maxsize=16):
+        if source is None:
+            if miniaudio is None:
+                raise RuntimeError("decoding audio needs the miniaudio package")
+            source = miniaudio.stream_file(path, output_format=miniaudio.SampleFormat.SIGNED16,
+                                           nchannels=1, sample_rate=sample_rate,
+                                           frames_to_read=chunk)
+        self.sample_rate = sample_rate
+        self.error = None
+        self._source = source
+        self._queue = queue.Queue(maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="beat-decoder", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _put(self, item):
+        """Queue `item` unless stop() is called while the queue is full."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            for chunk in self._source:
+                if not self._put(chunk):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            # let go of the file even if the consumer gave up early
+            close = getattr(self._source, "close", None)
+            if close is not None:
+                close()
+            self._put(self._END)
+
+    def __iter__(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is self._END:
+                break
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+class BeatMap:
+    """Beat (and onset) times of one track in whole ms, plus its tempo."""
+
+    def __init__(self, beats, onsets=(), tempo=0.0):
+        self.beats = array("I", beats)
+        self.onsets = array("I", onsets)
+        self.tempo = tempo
+
+    def __len__(self):
+        return len(self.beats)
+
+    def next_beat(self, ms):
+        """Index of the first beat at or after `ms` (len(self) if none)."""
+        return bisect.bisect_left(self.beats, ms)
+
+    def to_bytes(self):
+        beats, onsets = array("I", self.beats), array("I", self.onsets)
+        if sys.byteorder == "big":
+            beats.byteswap()
+            onsets.byteswap()
+        return (MAGIC + struct.pack("<fII", self.tempo, len(beats), len(onsets))
+                + beats.tobytes() + onsets.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a beat map (or an older version)")
+        off = len(MAGIC)
+        tempo, n_beats, n_onsets = struct.unpack_from("<fII", data, off)
+        off += struct.calcsize("<fII")
+        values = array("I")
+        values.frombytes(data[off:off + 4 * (n_beats + n_onsets)])
+        if len(values) != n_beats + n_onsets:
+            raise ValueError("truncated beat map")
+        if sys.byteorder == "big":
+            values.byteswap()
+        return cls(values[:n_beats], values[n_beats:], round(tempo, 2))
+
+
+# --- analysis -----------------------------------------------------------
+
+def _envelope(chunks):
+    """Mean energy of every HOP-sample frame, in 0 … 1."""
+    try:
+        import numpy as np      # only needed once analysis runs, not at start-up
+    except ImportError:
+        np = None
+    scale = 1.0 / (HOP * 32768.0 * 32768.0)
+    energies, rest = [], []
+    for chunk in chunks:
+        if np is not None:
+            samples = np.concatenate([np.asarray(rest, dtype=np.float64),
+                                      np.asarray(chunk, dtype=np.float64)])
+            n = len(samples) // HOP * HOP
+            frames = samples[:n].reshape(-1, HOP)
+            energies.extend((np.einsum("ij,ij->i", frames, frames) * scale).tolist())
+            rest = samples[n:].tolist()
+        else:
+            samples = rest + list(chunk)
+            n = len(samples) // HOP * HOP
+            for i in range(0, n, HOP):
+                energies.append(sum(v * v for v in samples[i:i + HOP]) * scale)
+            rest = samples[n:]
+    return energies
+
+
+def _onset_strength(energies):
+    """Rise in log energy from one frame to the next (never negative)."""
+    logs = [math.log1p(1000.0 * e) for e in energies]
+    return [0.0] + [max(0.0, b - a) for a, b in zip(logs, logs[1:])]
+
+
+def _pick_onsets(strength, radius=8):
+    """Local maxima that stand out from the surrounding ±radius frames."""
+    if not strength:
+        return []
+    floor = 0.1 * max(strength)
+    onsets = []
+    for i in range(1, len(strength) - 1):
+        s = strength[i]
+        if s <= floor or s < strength[i - 1] or s <= strength[i + 1]:
+            continue
+        window = strength[max(0, i - radius):i + radius + 1]
+        if s > 1.5 * sum(window) / len(window):
+            onsets.append(i)
+    return onsets
+
+
+def _beat_period(strength, frame_ms, bpm_range=(70, 180)):
+    """Beat length in frames: the strongest self-similarity lag in range."""
+    lo = max(1, int(60000 / bpm_range[1] / frame_ms))
+    hi = int(60000 / bpm_range[0] / frame_ms) + 1
+    best, best_score = None, 0.0
+    for lag in range(lo, min(hi, len(strength) - 1) + 1):
+        score = sum(a * b for a, b in zip(strength, strength[lag:])) / (len(strength) - lag)
+        if score > best_score:
+            best, best_score = lag, score
+    return best
+
+
+def _track_beats(strength, period):
+    """
+    Beat frames: start on the strongest phase, then step one period at a
+    time, snapping each beat to the strongest frame near where it was
+    expected so tempo drift does not pile up.
+    """
+    n = len(strength)
+    # phase from the opening bars only: a whole-number period drifts
+    phase = max(range(min(period, n)),
+                key=lambda p: sum(strength[p:p + 8 * period:period]))
+    floor = 0.1 * max(strength)
+    slack = max(1, period // 4)
+    beats, expected = [], phase
+    while expected < n:
+        lo, hi = max(0, expected - slack), min(n, expected + slack + 1)
+        beat = max(range(lo, hi), key=strength.__getitem__)
+        if strength[beat] <= floor:
+            # nothing there (a break in the music): keep the beat going
+            beat = min(expected, n - 1)
+        if not beats or beat > beats[-1]:
+            beats.append(beat)
+        expected = beat + period
+    return beats
+
+
+def analyse(chunks, sample_rate=SAMPLE_RATE):
+    """BeatMap for a stream of mono sample chunks."""
+    frame_ms = HOP * 1000.0 / sample_rate
+    strength = _onset_strength(_envelope(chunks))
+    onsets = _pick_onsets(strength)
+    period = _beat_period(strength, frame_ms)
+    if period is None:
+        return BeatMap([], [round(i * frame_ms) for i in onsets])
+    beats = _track_beats(strength, period)
+    # tempo from the tracked beats: the period is a whole number of frames
+    # (~23 ms), which alone would put 120 BPM at 117.45
+    span = (beats[-1] - beats[0]) / (len(beats) - 1) if len(beats) > 1 else period
+    return BeatMap([round(i * frame_ms) for i in beats],
+                   [round(i * frame_ms) for i in onsets],
+                   tempo=round(60000.0 / (span * frame_ms), 2))
+
+
+# --- cache --------------------------------------------------------------
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_path(path, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(asset_cache.cache_dir(), f"{stem}-{digest[:16]}.beats")
+
+
+def load(path):
+    """
+    The BeatMap for an audio file: read from the cache, or decoded and
+    analysed (then cached) the first time this exact file is seen.
+    Raises RuntimeError if it has to decode and miniaudio is missing.
+    """
+    cached = _cache_path(path, file_digest(path))
+    try:
+        with open(cached, "rb") as f:
+            return BeatMap.from_bytes(f.read())
+    except (OSError, ValueError, struct.error):
+        pass
+
+    decoder = StreamDecoder(path).start()
+    try:
+        beats = analyse(decoder, decoder.sample_rate)
+    finally:
+        decoder.stop()
+    asset_cache.store_bytes(cached, beats.to_bytes())
+    return beats
+
+
+def load_async(path, widget, on_ready, poll_ms=50):
+    """
+    load() on a worker thread. `on_ready(beat_map)` is called from the
+    Tk loop of `widget` once it is done, with None if it failed, so the
+    caller never blocks and never touches Tk from another thread.
+    """
+    result = queue.Queue(1)
+
+    def work():
+        try:
+            result.put(load(path))
+        except Exception as e:
+            log.info("no beat map for %s: %s", path, e)
+            result.put(None)
+
+    def poll():
+        try:
+            beats = result.get_nowait()
+        except queue.Empty:
+            widget.after(poll_ms, poll)
+            return
+        on_ready(beats)
+
+    threading.Thread(target=work, name="beat-map", daemon=True).start()
+    widget.after(poll_ms, poll)
+
+
+# --- scheduling ---------------------------------------------------------
+
+class BeatScheduler:
+    """
+    Plays MovementsManager moves on the beat. Each move starts on a beat
+    and is stretched to fill `fill` of the gap to the next one. Beats
+    closer than `min_gap_ms` to the previous move are skipped, and a move
+    never lasts more than `max_stretch` × the manager's move_duration.
+    """
+
+    def __init__(self, mm, beat_map, min_gap_ms=None, fill=0.9, max_stretch=2.0):
+        self.mm = mm
+        self.beats = beat_map.beats
+        move_duration = mm.mgr.move_duration
+        self.min_gap_ms = move_duration / 2 if min_gap_ms is None else min_gap_ms
+        self.fill = fill
+        self.max_duration = move_duration * max_stretch
+        self._job = None
+
+    def plan(self, move_ids, at_ms=0):
+        """
+        [(start_ms, duration_ms, move_id), ...] on the track's timeline,
+        starting from the first beat at or after `at_ms`. Moves past the
+        last beat carry on at the plain move_duration.
+        """
+        beats, out = self.beats, []
+        move_duration = self.mm.mgr.move_duration
+        i = bisect.bisect_left(beats, at_ms)
+        start = None
+        for move_id in move_ids:
+            if start is not None:
+                i = bisect.bisect_left(beats, start + self.min_gap_ms, i)
+            if i < len(beats):
+                start = beats[i]
+                nxt = bisect.bisect_left(beats, start + self.min_gap_ms, i + 1)
+                gap = beats[nxt] - start if nxt < len(beats) else move_duration / self.fill
+            else:
+                start = at_ms if start is None else start + move_duration
+                gap = move_duration / self.fill
+            out.append((start, min(gap * self.fill, self.max_duration), move_id))
+        return out
+
+    def start(self, move_ids, at_ms=0, on_complete=None):
+        """
+        Schedule `move_ids`; `at_ms` is where the track is right now. All
+        timers are set against that one instant, so late callbacks shorten
+        the move they start instead of pushing every later beat back.
+        Returns the plan.
+        """
+        self.cancel()
+        plan = self.plan(move_ids, at_ms)
+        master = self.mm.mgr.master
+        now = windowMove.FrameClock.for_widget(master).now
+        origin = now() * 1000 - at_ms
+
+        def fire(i):
+            start, duration, move_id = plan[i]
+            late = now() * 1000 - origin - start
+            done = on_complete if i == len(plan) - 1 else None
+            self.mm.run_move(move_id, done, duration=max(10, round(duration - max(0, late))))
+            schedule(i + 1)
+
+        def schedule(i):
+            self._job = None
+            if i < len(plan):
+                delay = plan[i][0] - (now() * 1000 - origin)
+                self._job = master.after(max(0, round(delay)), lambda: fire(i))
+
+        if plan:
+            schedule(0)
+        elif on_complete:
+            master.after(0, on_complete)
+        return plan
+
+    def cancel(self):
+        """Drop the moves that have not started yet."""
+        if self._job is not None:
+            self.mm.mgr.master.after_cancel(self._job)
+            self._job = None
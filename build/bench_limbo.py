@@ -0,0 +1,203 @@
+"""
+Headless benchmarks for KeyManager / MovementsManager.
+
+Runs every case on the in-memory window backend with a simulated clock,
+so no display is needed. Prints one JSON object per case (JSON lines) by
+default, or a table with --table.
+
+    python bench_limbo.py
+    python bench_limbo.py --seed 7 --games 20 --table
+    python bench_limbo.py --grids 4x2,8x8,16x16 --table   # key-count scaling
+"""
+import argparse, json, random, sys, time, tracemalloc
+
+import windowMove
+from window_backend import HeadlessBackend, VirtualClock
+from limbo_window import KeyManager, MovementsManager
+import move_compiler
+import instrument
+
+SCHEMA = 1
+
+
+def make_manager(grid=(4, 2), render_mode="windows"):
+    backend = HeadlessBackend(clock=VirtualClock(charge_callbacks=True))
+    mgr = KeyManager(move_duration=320, curve=True, overshoot=False, backend=backend,
+                     rows=grid[0], cols=grid[1], render_mode=render_mode)
+    # start every key at its home slot, as setup() leaves them
+    for key_id in range(1, mgr.key_count + 1):
+        w = mgr.open(key_id)
+        windowMove.setWindowPosition(*mgr.xy_positions[key_id], w.root)
+    backend.clock.run()
+    backend.geometry_calls = backend.canvas_updates = backend.image_updates = 0
+    return mgr
+
+
+def run_case(name, moves, drive, grid=(4, 2), render_mode="windows"):
+    """
+    Time `drive(mgr, done)` to completion on a fresh headless manager with
+    a rows × cols `grid` of keys. `moves` is how many moves the case plays
+    (for per-move figures).
+    """
+    def once():
+        mgr = make_manager(grid, render_mode)
+        clock = mgr.backend.clock
+        finished = []
+        started = time.perf_counter()
+        drive(mgr, lambda: finished.append(True))
+        clock.run()
+        wall = time.perf_counter() - started
+        if not finished:
+            raise RuntimeError(f"{name}: sequence never completed")
+        return mgr, wall
+
+    mgr, wall = once()
+    clock = mgr.backend.clock
+    frame_clock = windowMove.FrameClock.for_widget(mgr.master)
+
+    # second pass only for memory: tracemalloc skews the timings
+    tracemalloc.start()
+    once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "schema": SCHEMA,
+        "case": name,
+        "keys": mgr.key_count,
+        "render_mode": render_mode,
+        "moves": moves,
+        "frames": frame_clock.frames,
+        "dropped_frames": frame_clock.dropped_frames,
+        "sim_seconds": round(clock.time, 4),
+        "wall_seconds": round(wall, 6),
+        "fps": round(frame_clock.frames / wall, 1) if wall else None,
+        "frame_ms": round(wall * 1000 / frame_clock.frames, 4) if frame_clock.frames else None,
+        "jitter_ms": {
+            "mean": round(sum(clock.lateness) / len(clock.lateness), 4) if clock.lateness else 0.0,
+            "p95": round(instrument.percentile(clock.lateness, 95), 4),
+            "max": round(max(clock.lateness, default=0.0), 4),
+        },
+        "geometry_calls": mgr.backend.geometry_calls,
+        "geometry_per_move": round(mgr.backend.geometry_calls / moves, 2),
+        "canvas_updates": mgr.backend.canvas_updates,
+        "image_updates": mgr.backend.image_updates,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def chain(steps, done):
+    """Run callables taking on_complete one after another."""
+    def run_next(i=0):
+        if i == len(steps):
+            done()
+            return
+        steps[i](lambda: run_next(i + 1))
+    run_next()
+
+
+def bench_cases(seed, swaps, games):
+    rng = random.Random(seed)
+    cases = []
+
+    # KeyManager primitives
+    pairs = [tuple(rng.sample(range(1, 9), 2)) for _ in range(swaps)]
+    cases.append(("keymanager.swap_keys", swaps, lambda mgr, done: chain(
+        [lambda cb, a=a, b=b: mgr.swap_keys(a, b, on_complete=cb) for a, b in pairs], done)))
+    ring = [1, 2, 4, 6, 8, 7, 5, 3]
+    cases.append(("keymanager.rotate_keys", swaps, lambda mgr, done: chain(
+        [lambda cb, cw=bool(i % 2): mgr.rotate_keys(ring, clockwise=cw, on_complete=cb)
+         for i in range(swaps)], done)))
+
+    # each MovementsManager move on its own
+    for move_id in range(1, 17):
+        cases.append((f"move.{move_id:02d}", 1, lambda mgr, done, move_id=move_id:
+                      MovementsManager(mgr).moves[move_id](oncomplete=done)))
+
+    # game()-length sequences
+    sequences = [rng.choices(range(1, 17), k=25) for _ in range(games)]
+    cases.append(("game.25", 25 * games, lambda mgr, done: chain(
+        [lambda cb, seq=seq: MovementsManager(mgr).play(seq, on_complete=cb) for seq in sequences], done)))
+    return cases
+
+
+def scaling_cases(seed, grids):
+    """The same 25-move game on bigger and bigger grids."""
+    seq = move_compiler.random_game(random.Random(seed))
+    return [(f"scale.{rows}x{cols}", 25,
+             lambda mgr, done: MovementsManager(mgr).play(seq, on_complete=done),
+             (rows, cols))
+            for rows, cols in grids]
+
+
+def parse_grids(text):
+    return [tuple(int(v) for v in g.split("x")) for g in text.split(",") if g]
+
+
+def bench_compile(seed, games):
+    """Compile seeded 25-move games without any windows at all."""
+    rng = random.Random(seed)
+    sequences = [move_compiler.random_game(rng) for _ in range(games)]
+    started = time.perf_counter()
+    stages = 0
+    for seq in sequences:
+        compiled = move_compiler.compile_moves(seq)
+        compiled.track(1)
+        stages += len(compiled.stages)
+    wall = time.perf_counter() - started
+    return {
+        "schema": SCHEMA,
+        "case": "compile.game.25",
+        "moves": 25 * games,
+        "wall_seconds": round(wall, 6),
+        "games_per_sec": round(games / wall, 1) if wall else None,
+        "stages_per_game": round(stages / games, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--swaps", type=int, default=50, help="moves per KeyManager case")
+    parser.add_argument("--games", type=int, default=10, help="25-move sequences to play")
+    parser.add_argument("--compile-games", type=int, default=5000,
+                        help="games for the compile-only case")
+    parser.add_argument("--grids", type=parse_grids, default=parse_grids("4x2,4x4,8x8,16x16"),
+                        metavar="RxC,...", help="grids for the key-count scaling cases")
+    parser.add_argument("--table", action="store_true", help="human-readable output")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record hot-path spans and write a Chrome trace")
+    args = parser.parse_args(argv)
+    if args.trace:
+        instrument.enable()
+
+    results = [run_case(name, moves, drive)
+               for name, moves, drive in bench_cases(args.seed, args.swaps, args.games)]
+    results += [run_case(name, moves, drive, grid)
+                for name, moves, drive, grid in scaling_cases(args.seed, args.grids)]
+    results.append(bench_compile(args.seed, args.compile_games))
+
+    if args.table:
+        print(f"{'case':<24}{'keys':>6}{'fps':>10}{'frame ms':>10}{'jit p95':>9}"
+              f"{'geo/move':>10}{'drop':>6}{'peak KiB':>10}")
+        for r in results:
+            if "fps" not in r:
+                continue
+            print(f"{r['case']:<24}{r['keys']:>6}{r['fps']:>10}{r['frame_ms']:>10}"
+                  f"{r['jitter_ms']['p95']:>9}{r['geometry_per_move']:>10}"
+                  f"{r['dropped_frames']:>6}{r['peak_kib']:>10}")
+        for r in results:
+            if "games_per_sec" in r:
+                print(f"{r['case']}: {r['games_per_sec']} games/s, "
+                      f"{r['stages_per_game']} stages/game")
+    else:
+        for r in results:
+            print(json.dumps(r, sort_keys=True))
+
+    if args.trace:
+        instrument.export_chrome_trace(args.trace)
+        print(instrument.format_summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-frame cost of the two render modes: one Toplevel per key ("windows")
+vs every key on one overlay canvas ("canvas").
+
+Plays the same seeded 25-move game in both modes. With a display this
+runs on real Tk, so window-manager round trips and canvas repaints are
+in the numbers; without one it falls back to the headless backend, which
+only shows the Python side of a frame.
+
+    python bench_render.py --table
+    python bench_render.py --grids 4x2,8x8 --headless
+"""
+import argparse, json, random, sys, time
+
+import instrument
+import move_compiler
+import windowMove
+from bench_limbo import SCHEMA, make_manager, parse_grids
+from bench_startup import has_display
+from limbo_window import KeyManager, MovementsManager
+
+MODES = KeyManager.RENDER_MODES
+
+
+def tk_manager(grid, render_mode):
+    mgr = KeyManager(move_duration=320, curve=True, overshoot=False,
+                     rows=grid[0], cols=grid[1], render_mode=render_mode)
+    for key_id in range(1, mgr.key_count + 1):
+        w = mgr.open(key_id)
+        windowMove.setWindowPosition(*mgr.xy_positions[key_id], w.root)
+    # everything mapped and drawn before the clock starts
+    mgr.master.update()
+    return mgr
+
+
+def run_case(seq, grid, render_mode, headless):
+    mgr = make_manager(grid, render_mode) if headless else tk_manager(grid, render_mode)
+    clock = windowMove.FrameClock.for_widget(mgr.master)
+    frames, dropped = clock.frames, clock.dropped_frames
+
+    instrument.enable()
+    cpu = time.process_time()
+    if headless:
+        MovementsManager(mgr).play(seq)
+        mgr.backend.clock.run()
+    else:
+        MovementsManager(mgr).play(seq, on_complete=mgr.master.quit)
+        mgr.master.mainloop()
+    cpu = time.process_time() - cpu
+    instrument.disable()
+
+    frames = clock.frames - frames
+    spans = [dur / 1e6 for ph, name, _, _, dur, _ in instrument.events()
+             if ph == "X" and name == "frame"]
+    updates = sum(args["windows"] for ph, name, _, _, _, args in instrument.events()
+                  if ph == "X" and name == "geometry")
+    if not headless:
+        mgr.master.destroy()
+
+    return {
+        "schema": SCHEMA,
+        "case": f"render.{render_mode}.{grid[0]}x{grid[1]}",
+        "backend": "headless" if headless else "tk",
+        "render_mode": render_mode,
+        "keys": grid[0] * grid[1],
+        "moves": len(seq),
+        "frames": frames,
+        "dropped_frames": clock.dropped_frames - dropped,
+        "frame_ms": {"p50": round(instrument.percentile(spans, 50), 4),
+                     "p95": round(instrument.percentile(spans, 95), 4),
+                     "max": round(max(spans, default=0.0), 4)},
+        # whole-process CPU per frame: includes Tk's repaint / WM work
+        "cpu_ms_per_frame": round(cpu * 1000 / frames, 4) if frames else None,
+        # window moves ("windows") or canvas coords calls ("canvas")
+        "updates_per_frame": round(updates / frames, 2) if frames else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--grids", type=parse_grids, default=parse_grids("4x2,8x8"),
+                        metavar="RxC,...")
+    parser.add_argument("--headless", action="store_true", help="skip Tk even if a display exists")
+    parser.add_argument("--table", action="store_true", help="human-readable output")
+    args = parser.parse_args(argv)
+
+    headless = args.headless or not has_display()
+    seq = move_compiler.random_game(random.Random(args.seed))
+    results = [run_case(seq, grid, mode, headless) for grid in args.grids for mode in MODES]
+
+    if args.table:
+        print(f"{'case':<22}{'keys':>6}{'p50 ms':>9}{'p95 ms':>9}{'cpu/frame':>11}{'upd/frame':>11}")
+        for r in results:
+            print(f"{r['case']:<22}{r['keys']:>6}{r['frame_ms']['p50']:>9}{r['frame_ms']['p95']:>9}"
+                  f"{r['cpu_ms_per_frame']:>11}{r['updates_per_frame']:>11}")
+        by_case = {(r["keys"], r["render_mode"]): r for r in results}
+        for grid in args.grids:
+            keys = grid[0] * grid[1]
+            windows, canvas = by_case[keys, "windows"], by_case[keys, "canvas"]
+            if canvas["cpu_ms_per_frame"]:
+                print(f"{keys} keys: windows / canvas cpu per frame = "
+                      f"{windows['cpu_ms_per_frame'] / canvas['cpu_ms_per_frame']:.2f} ({results[0]['backend']})")
+    else:
+        for r in results:
+            print(json.dumps(r, sort_keys=True))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
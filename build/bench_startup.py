@@ -0,0 +1,131 @@
+"""
+Startup-time benchmark with a per-phase breakdown.
+
+Each run is a fresh interpreter so imports are really cold. The first run
+uses an empty asset cache (cold), the rest reuse it (warm). Uses the real
+Tk menu when a display is available, else the headless backend.
+
+    python bench_startup.py                    # JSON
+    python bench_startup.py --runs 7 --table
+    python bench_startup.py --budget-ms 400    # exit 1 if warm TTFF is over
+"""
+import argparse, json, os, statistics, subprocess, sys, tempfile, time
+
+SCHEMA = 1
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def child(headless):
+    """One startup, timed phase by phase. Prints a JSON dict of ms."""
+    phases = {}
+
+    def mark(name, started):
+        phases[name] = round((time.perf_counter() - started) * 1000, 3)
+        return time.perf_counter()
+
+    t = t0 = time.perf_counter()
+    import limbo_window
+    import asset_cache
+    t = mark("import", t)
+
+    if not headless:
+        root = limbo_window.build_main_menu()
+        t = mark("menu", t)
+        # first frame: the menu is mapped and drawn
+        while not root.winfo_viewable():
+            root.update()
+        root.update_idletasks()
+        t = mark("first_frame", t)
+        phases["time_to_first_frame"] = round((t - t0) * 1000, 3)
+
+        mgr = limbo_window.mgr
+        # key windows are idle work for after the menu: none yet
+        phases["keys_at_first_frame"] = len(mgr.windows)
+        while len(mgr.windows) < mgr.key_count:
+            root.update()
+        mark("keys_ready", t)
+        root.destroy()
+        mgr.master.destroy()
+    else:
+        from window_backend import HeadlessBackend
+        # the same build_main_menu() as the game, on in-memory windows
+        root = limbo_window.build_main_menu(HeadlessBackend())
+        t = mark("menu", t)
+        phases["time_to_first_frame"] = round((t - t0) * 1000, 3)
+
+        mgr = limbo_window.mgr
+        phases["keys_at_first_frame"] = len(mgr.windows)
+        # idle work after the menu is up: atlas warm + the key windows
+        clock = mgr.backend.clock
+        while len(mgr.windows) < mgr.key_count and clock.run(max_callbacks=1):
+            pass
+        mark("keys_ready", t)
+
+    phases["cache_hits"] = asset_cache.hits
+    phases["cache_misses"] = asset_cache.misses
+    print(json.dumps(phases))
+
+
+def has_display():
+    try:
+        from tkinter import Tk
+        Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+
+def run(headless, cache):
+    env = dict(os.environ, LIMBO_CACHE_DIR=cache)
+    cmd = [sys.executable, os.path.abspath(__file__), "--child"]
+    if headless:
+        cmd.append("--headless")
+    out = subprocess.run(cmd, env=env, cwd=HERE, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="warm runs after the cold one")
+    parser.add_argument("--headless", action="store_true", help="skip Tk even if a display exists")
+    parser.add_argument("--budget-ms", type=float, help="warm time-to-first-frame limit")
+    parser.add_argument("--table", action="store_true", help="human-readable output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.headless)
+        return 0
+
+    headless = args.headless or not has_display()
+    with tempfile.TemporaryDirectory() as cache:
+        cold = run(headless, cache)
+        warm_runs = [run(headless, cache) for _ in range(args.runs)]
+
+    warm = {name: round(statistics.median(r[name] for r in warm_runs), 3)
+            for name in warm_runs[0]} if warm_runs else {}
+    result = {
+        "schema": SCHEMA,
+        "backend": "headless" if headless else "tk",
+        "runs": args.runs,
+        "cold": cold,
+        "warm_median": warm,
+        "budget_ms": args.budget_ms,
+    }
+    over = (args.budget_ms is not None and warm
+            and warm["time_to_first_frame"] > args.budget_ms)
+    result["within_budget"] = None if args.budget_ms is None else not over
+
+    if args.table:
+        print(f"{'phase':<22}{'cold ms':>10}{'warm ms':>10}")
+        for name in cold:
+            print(f"{name:<22}{cold[name]:>10}{warm.get(name, ''):>10}")
+        if args.budget_ms is not None:
+            print(f"budget {args.budget_ms} ms: {'over' if over else 'ok'}")
+    else:
+        print(json.dumps(result, sort_keys=True))
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+One transparent, full-screen overlay window with a Canvas, for drawing
+every key as a canvas item instead of giving each key its own Toplevel
+(KeyManager(render_mode="canvas")).
+
+Moving an item is a canvas coordinate update instead of a window-manager
+round trip, and Tk repaints the whole canvas once per frame. ItemWindow
+gives each item the handful of window methods windowMove and KeyManager
+use, so animations run unchanged.
+"""
+from tkinter import TclError
+
+
+class Overlay:
+    def __init__(self, backend, master, transparent_color="magenta"):
+        width, height = backend.screen_size(master)
+        self.window = backend.toplevel(master)
+        self.window.title("Limbo Keys")
+        self.window.overrideredirect(True)
+        self.window.geometry(f"{width}x{height}+0+0")
+        self.window.config(bg=transparent_color)
+        self.window.wm_attributes("-transparentcolor", transparent_color)
+        self.window.wm_attributes("-topmost", True)
+
+        # canvas coordinates are screen coordinates: the overlay sits at +0+0
+        self.canvas = backend.canvas(self.window, width=width, height=height,
+                                     bg=transparent_color,
+                                     borderwidth=0, highlightthickness=0)
+        self.canvas.place(x=0, y=0)
+
+    def add(self, image, x=0, y=0):
+        """New (hidden) image item, wrapped as an ItemWindow."""
+        item = self.canvas.create_image(x, y, image=image, anchor="nw", state="hidden")
+        return ItemWindow(self.canvas, item, x, y)
+
+    def destroy(self):
+        self.window.destroy()
+
+
+class ItemWindow:
+    """
+    A canvas item that answers to the window calls windowMove and
+    KeyManager make: geometry("+x+y"), winfo_x/y, withdraw/deiconify,
+    lift, after and destroy. Its position is kept here, so reading it
+    back costs nothing.
+    """
+
+    def __init__(self, canvas, item, x=0, y=0):
+        self.canvas = canvas
+        self.item = item
+        self.x, self.y = x, y
+        self._destroyed = False
+
+    def _root(self):
+        return self.canvas._root()
+
+    def _check(self):
+        if self._destroyed:
+            raise TclError("canvas item was deleted")
+
+    def geometry(self, spec=None):
+        self._check()
+        if spec is None:
+            return f"+{self.x}+{self.y}"
+        # a size part ("120x84+x+y") is ignored: items are as big as their image
+        _, _, pos = spec.partition("+")
+        if pos:
+            x, y = pos.split("+")
+            self.x, self.y = int(x), int(y)
+            self.canvas.coords(self.item, self.x, self.y)
+
+    def winfo_x(self):
+        self._check()
+        return self.x
+
+    def winfo_y(self):
+        self._check()
+        return self.y
+
+    def winfo_exists(self):
+        return not self._destroyed
+
+    def config(self, **kwargs):
+        self._check()
+        self.canvas.itemconfig(self.item, **kwargs)
+
+    configure = config
+
+    def withdraw(self):
+        self.config(state="hidden")
+
+    def deiconify(self):
+        self.config(state="normal")
+
+    def lift(self):
+        self._check()
+        self.canvas.tag_raise(self.item)
+
+    def after(self, ms, fn=None, *args):
+        return self.canvas.after(ms, fn, *args)
+
+    def after_idle(self, fn, *args):
+        return self.canvas.after_idle(fn, *args)
+
+    def after_cancel(self, job):
+        self.canvas.after_cancel(job)
+
+    def destroy(self):
+        if not self._destroyed:
+            self._destroyed = True
+            self.canvas.delete(self.item)
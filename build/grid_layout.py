@@ -0,0 +1,118 @@
+"""
+Key-slot layout for any rows × cols grid, and the array-backed maps
+KeyManager keeps its position ↔ key bookkeeping in.
+
+Positions are numbered row-major from 1, as in the original 2-column
+layout (1 2 / 3 4 / ...). The grid hugs the right edge of the screen and
+keys shrink when the default size would not fit.
+"""
+from array import array
+from collections.abc import MutableMapping
+
+KEY_SIZE = (120, 84)    # limbo_key.png
+H_SPACING = 100
+
+
+class GridLayout:
+    """
+    Screen coordinates for a rows × cols grid of keys.
+
+    The original 4 × 2 grid is never scaled, so on any screen it is
+    exactly the hand-written 8-slot table the game started with. Other
+    grids scale the keys (and the gap between columns) down when they
+    would not fit the screen.
+    """
+    ORIGINAL = (4, 2)
+
+    def __init__(self, rows=4, cols=2, screen=(1920, 1080),
+                 key_size=KEY_SIZE, h_spacing=H_SPACING):
+        if rows < 1 or cols < 1:
+            raise ValueError(f"grid must be at least 1x1, got {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.count = rows * cols
+        width, height = screen
+
+        # keys may fill at most half the height (the rest is gaps) and the
+        # full width
+        kw, kh = key_size
+        if (rows, cols) == self.ORIGINAL:
+            self.scale = 1.0
+        else:
+            self.scale = min(1.0, (height / 2) / (rows * kh), width / (cols * (h_spacing + kw)))
+        kw, kh = max(1, int(kw * self.scale)), max(1, int(kh * self.scale))
+        h_spacing = int(h_spacing * self.scale)
+        v_spacing = height // (2 * rows)
+        self.key_size = (kw, kh)
+
+        self.positions = {}
+        for r in range(rows):
+            for c in range(cols):
+                self.positions[r * cols + c + 1] = (width - (h_spacing + kw) * (cols - c),
+                                                    v_spacing + r * (v_spacing + kh))
+
+    def pos(self, row, col):
+        return row * self.cols + col + 1
+
+    def cell(self, pos):
+        """(row, col) of a position."""
+        return divmod(pos - 1, self.cols)
+
+
+class SlotMap(MutableMapping):
+    """
+    int → int map over the fixed key range 1…size, stored in one flat
+    array (0 = empty). Lookups and updates are a single index, so moving
+    k keys costs O(k) however big the grid is. Assigning None empties
+    the slot.
+    """
+    __slots__ = ("_slots", "_len")
+
+    def __init__(self, size, items=()):
+        self._slots = array("I", [0]) * (size + 1)
+        self._len = 0
+        for k, v in items:
+            self[k] = v
+
+    def _index(self, k):
+        if type(k) is not int or not 0 < k < len(self._slots):
+            raise KeyError(k)
+        return k
+
+    def __getitem__(self, k):
+        try:
+            v = self._slots[self._index(k)]
+        except KeyError:
+            raise KeyError(k) from None
+        if not v:
+            raise KeyError(k)
+        return v
+
+    def __setitem__(self, k, v):
+        if v is None:
+            self.pop(k, None)
+            return
+        i = self._index(k)
+        if not self._slots[i]:
+            self._len += 1
+        self._slots[i] = v
+
+    def __delitem__(self, k):
+        i = self._index(k)
+        if not self._slots[i]:
+            raise KeyError(k)
+        self._slots[i] = 0
+        self._len -= 1
+
+    def __contains__(self, k):
+        return type(k) is int and 0 < k < len(self._slots) and self._slots[k] != 0
+
+    def __iter__(self):
+        slots = self._slots
+        return (k for k in range(1, len(slots)) if slots[k])
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,143 @@
+"""
+Opt-in hot-path instrumentation.
+
+Off by default. Call sites guard with `if instrument.enabled:` so the
+disabled cost is one attribute check; a site that times a span reads the
+flag once into a local (`traced = instrument.enabled`) and uses it for
+both ends, since tracing can be switched on in between. When on, events
+go into a fixed-size ring buffer (oldest dropped first) and can be
+written out as Chrome trace-event JSON (chrome://tracing, Perfetto) or
+summarised as a table.
+
+    import instrument
+    instrument.enable()
+    ...
+    instrument.export_chrome_trace("trace.json")
+    print(instrument.format_summary())
+
+Setting LIMBO_TRACE=<file> before starting the game does the same.
+"""
+import json, os, time
+
+enabled = False
+now = time.perf_counter_ns
+
+_events = None      # ring buffer of (ph, name, cat, ts_ns, dur_ns, args)
+_next = 0
+_count = 0
+
+
+def enable(capacity=65536):
+    """Start recording into a fresh ring buffer of `capacity` events."""
+    global enabled, _events, _next, _count
+    _events = [None] * capacity
+    _next = _count = 0
+    enabled = True
+
+
+def disable():
+    """Stop recording. Events recorded so far stay available."""
+    global enabled
+    enabled = False
+
+
+def _push(event):
+    global _next, _count
+    _events[_next] = event
+    _next = (_next + 1) % len(_events)
+    _count = min(_count + 1, len(_events))
+
+
+def span(name, start_ns, cat="limbo", args=None):
+    """Record a complete event that began at `start_ns` (from now())."""
+    if enabled:
+        _push(("X", name, cat, start_ns, now() - start_ns, args))
+
+
+def instant(name, cat="limbo", args=None):
+    """Record a point-in-time event."""
+    if enabled:
+        _push(("i", name, cat, now(), 0, args))
+
+
+def events():
+    """Recorded events, oldest first."""
+    if not _count:
+        return []
+    start = (_next - _count) % len(_events)
+    return [_events[(start + i) % len(_events)] for i in range(_count)]
+
+
+def chrome_trace():
+    """Events as a Chrome trace-event dict."""
+    out = []
+    for ph, name, cat, ts, dur, args in events():
+        ev = {"name": name, "cat": cat, "ph": ph, "ts": ts / 1000,
+              "pid": os.getpid(), "tid": 1}
+        if ph == "X":
+            ev["dur"] = dur / 1000
+        else:
+            ev["s"] = "t"
+        if args:
+            ev["args"] = args
+        out.append(ev)
+    return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path):
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f)
+
+
+def percentile(values, q):
+    """Nearest-rank q-th percentile of `values` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summary():
+    """
+    Per-event-name stats in ms: count, p50/p95/p99, max. Also the number of
+    dropped frames and the lateness of the frame timer.
+    """
+    durations, late, dropped = {}, [], 0
+    for ph, name, _, _, dur, args in events():
+        if ph == "X":
+            durations.setdefault(name, []).append(dur / 1e6)
+        elif name == "timer_late":
+            late.append(args["ms"])
+        elif name == "dropped_frames":
+            dropped += args["count"]
+
+    stats = {}
+    for name, values in durations.items():
+        stats[name] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": max(values),
+        }
+    return {
+        "spans": stats,
+        "dropped_frames": dropped,
+        "timer_late_ms": {"count": len(late),
+                          "p50": percentile(late, 50),
+                          "p95": percentile(late, 95),
+                          "p99": percentile(late, 99)},
+    }
+
+
+def format_summary():
+    s = summary()
+    lines = [f"{'span':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for name, st in sorted(s["spans"].items()):
+        lines.append(f"{name:<16}{st['count']:>8}{st['p50']:>10.3f}{st['p95']:>10.3f}"
+                     f"{st['p99']:>10.3f}{st['max']:>10.3f}")
+    late = s["timer_late_ms"]
+    lines.append(f"timer late: p50 {late['p50']:.2f} ms, p95 {late['p95']:.2f} ms, "
+                 f"p99 {late['p99']:.2f} ms over {late['count']} firings")
+    lines.append(f"dropped frames: {s['dropped_frames']}")
+    return "\n".join(lines)
@@ -1,24 +1,109 @@
-import math, time, random
+import math, time, random, logging
 from tkinter import *
 import os
 import windowMove
+import instrument
+import asset_cache
+import beat_map
+from window_backend import TkBackend
+from canvas_overlay import Overlay
+import move_compiler
+from grid_layout import GridLayout, SlotMap
 from PIL import Image, ImageTk, ImageEnhance
 from functools import wraps
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
 
 # Limbo Keys Doc: https://docs.google.com/spreadsheets/d/1zGRkD6pMkz7yvzlwYg2tb1-4BmHRPXrFRVTGdXmcaVA/edit?gid=0#gid=0
 
+class FadeAtlas:
+    """
+    Process-wide cache of pre-blended key frames. Alpha is quantized to
+    `levels` steps, so every fade of every key reuses the same handful of
+    PhotoImages. Frames are bound to a Tk interpreter and a key size, so the
+    cache is keyed by (root, level, size) and evicts the least recently used
+    frame once it holds `max_frames`.
+    """
+
+    def __init__(self, levels=20, max_frames=64):
+        self.levels = levels
+        self.max_frames = max_frames
+        self.hits = 0
+        self.misses = 0
+        self._images = {}               # size -> (base, overlay) PIL images
+        self._blends = {}               # (level, size) -> PIL image
+        self._frames = OrderedDict()    # (root, level, size) -> PhotoImage
+
+    def _load(self, size):
+        # load images once per size (decoded RGBA comes from the disk cache)
+        images = self._images.get(size)
+        if images is None:
+            folder = os.path.dirname(os.path.abspath(__file__))
+            images = self._images[size] = (
+                asset_cache.load_image(os.path.join(folder, "limbo_key.png"), size=size),
+                asset_cache.load_image(os.path.join(folder, "limbo_key_green.png"), size=size))
+        return images
+
+    def level(self, alpha):
+        """Nearest quantized level for an alpha in 0.0 … 1.0."""
+        return round(min(1.0, max(0.0, alpha)) * self.levels)
+
+    def blend(self, level, size=None):
+        """Blend base + overlay at the given level (PIL image)."""
+        img = self._blends.get((level, size))
+        if img is None:
+            base, overlay = self._load(size)
+            img = self._blends[level, size] = Image.blend(base, overlay,
+                                                          level / self.levels)
+        return img
+
+    def frame(self, master, alpha, make_photo=None, size=None):
+        """
+        PhotoImage for `alpha`, usable by any widget under `master`.
+        `size` is (width, height), default the PNG's own. `make_photo(image,
+        master)` builds the frame on a miss (default: ImageTk.PhotoImage).
+        """
+        key = (master._root(), self.level(alpha), size)
+        img = self._frames.get(key)
+        if img is not None:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return img
+
+        self.misses += 1
+        if make_photo is None:
+            img = ImageTk.PhotoImage(self.blend(key[1], size), master=key[0])
+        else:
+            img = make_photo(self.blend(key[1], size), key[0])
+        self._frames[key] = img
+        if len(self._frames) > self.max_frames:
+            # widgets still showing an evicted frame keep their own reference
+            self._frames.popitem(last=False)
+        return img
+
+    def warm(self, master, make_photo=None, size=None):
+        """Build every level for `master` up front."""
+        for level in range(self.levels + 1):
+            self.frame(master, level / self.levels, make_photo, size)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "frames": len(self._frames)}
+
+
 class LimboWindow:
-    # load once per process
-    _base_img    = None
-    _overlay_img = None
+    # shared by every key window in the process
+    atlas = FadeAtlas()
 
     def __init__(self, key_id, manager, size=(120,84), transparent_color='magenta'):
         self.key_id = key_id
         self.manager = manager
+        self.size = size
         self.transparent_color = transparent_color
 
         # --- init window as before ---
-        self.root = Toplevel(manager.master)
+        self.root = manager.backend.toplevel(manager.master)
         # self.root.title(f"Limbo Key #{key_id}")
         self.root.title(f"Limbo Key")
         self.root.geometry(f"{size[0]}x{size[1]}")
@@ -28,18 +113,12 @@ class LimboWindow:
         self.root.wm_attributes('-transparentcolor', self.transparent_color)
 
         # label to show our composite
-        self.label = Label(self.root,
-                           bg=self.transparent_color,
-                           borderwidth=0,
-                           highlightthickness=0)
+        self.label = manager.backend.label(self.root,
+                                           bg=self.transparent_color,
+                                           borderwidth=0,
+                                           highlightthickness=0)
         self.label.place(x=0, y=0)
 
-        # load images once
-        if LimboWindow._base_img is None:
-            folder = os.path.dirname(os.path.abspath(__file__))
-            LimboWindow._base_img    = Image.open(os.path.join(folder, "limbo_key.png")).convert("RGBA")
-            LimboWindow._overlay_img = Image.open(os.path.join(folder, "limbo_key_green.png")).convert("RGBA")
-
         # internal state
         self._current_alpha = 0.0    # 0.0 = no overlay, 1.0 = full overlay
         self._fade_job      = None   # after() job ID
@@ -50,17 +129,16 @@ class LimboWindow:
         # cleanup
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
-    def _composite(self, alpha):
-        """Blend base + overlay at given alpha."""
-        return Image.blend(LimboWindow._base_img,
-                           LimboWindow._overlay_img,
-                           alpha)
-
     def _redraw(self):
-        """Render the current composite into the Tk label."""
-        comp = self._composite(self._current_alpha)
-        self._tk_img = ImageTk.PhotoImage(comp, master=self.root)
-        self.label.config(image=self._tk_img)
+        """Show the cached frame for the current alpha in the Tk label."""
+        traced = instrument.enabled
+        if traced:
+            t0 = instrument.now()
+        self._set_image(LimboWindow.atlas.frame(self.root, self._current_alpha,
+                                                self.manager.backend.photo_image,
+                                                self.size))
+        if traced:
+            instrument.span("redraw", t0, args={"key": self.key_id})
 
     def change_colour(self, on_off: bool, duration: int = 200, steps: int = 10):
         """
@@ -77,10 +155,19 @@ class LimboWindow:
         delta = (end - start) / steps
         interval = duration // steps
 
+        # look every frame up front so each step is just a label reconfigure
+        alphas = [min(1.0, max(0.0, start + delta * i)) for i in range(steps + 1)]
+        make_photo = self.manager.backend.photo_image
+        frames = [LimboWindow.atlas.frame(self.root, a, make_photo, self.size) for a in alphas]
+
         def step(count=0):
-            nonlocal start, delta, steps
-            self._current_alpha = min(1.0, max(0.0, start + delta * count))
-            self._redraw()
+            traced = instrument.enabled
+            if traced:
+                t0 = instrument.now()
+            self._current_alpha = alphas[count]
+            self._set_image(frames[count])
+            if traced:
+                instrument.span("redraw", t0, args={"key": self.key_id})
 
             if count < steps:
                 self._fade_job = self.root.after(interval, lambda: step(count+1))
@@ -90,6 +177,10 @@ class LimboWindow:
         # kick off
         step(0)
 
+    def _set_image(self, img):
+        self._tk_img = img
+        self.label.config(image=img)
+
     def show(self):
         self.root.deiconify()
         self.root.lift()
@@ -104,40 +195,120 @@ class LimboWindow:
         self.close()
 
 
+class LimboSprite(LimboWindow):
+    """
+    A key drawn as an image item on the manager's shared overlay canvas
+    (render_mode="canvas"). Same interface as LimboWindow; `root` is a
+    canvas_overlay.ItemWindow, so windowMove moves it like a window and
+    fades swap the item's image to the shared atlas frames.
+    """
+
+    def __init__(self, key_id, manager, size=(120,84)):
+        self.key_id = key_id
+        self.manager = manager
+        self.size = size
+        self._current_alpha = 0.0
+        self._fade_job      = None
+
+        self._tk_img = LimboWindow.atlas.frame(manager.master, 0.0,
+                                               manager.backend.photo_image, size)
+        self.root = manager.overlay.add(self._tk_img)
+
+    def _set_image(self, img):
+        if img is not self._tk_img:
+            self._tk_img = img
+            self.root.config(image=img)
+
+
 class KeyManager:
-    def __init__(self, move_duration=300, curve=True, overshoot=True):
+    # "windows": one Toplevel per key, the original moving-windows look
+    # "canvas":  every key on one transparent overlay, much cheaper per frame
+    RENDER_MODES = ("windows", "canvas")
+
+    def __init__(self, move_duration=300, curve=True, overshoot=True, backend=None,
+                 rows=4, cols=2, render_mode="windows"):
+        if render_mode not in self.RENDER_MODES:
+            raise ValueError(f"render_mode must be one of {self.RENDER_MODES}, got {render_mode!r}")
+        self.render_mode = render_mode
+
+        # real Tk windows unless told otherwise (see window_backend)
+        self.backend = backend or TkBackend()
+
         # one hidden root for all windows
-        self.master = Tk()
+        self.master = self.backend.create_root()
         self.master.withdraw()
         self.windows = {}
+        self._layout = None
+        self._overlay = None
+
+        # keys sit on a rows × cols grid, numbered row-major from 1
+        self.rows = rows
+        self.cols = cols
+        self.key_count = rows * cols
 
         self.move_duration = move_duration
         self.curve = curve
         self.overshoot = overshoot
 
-        # 1) pre-create all 8 windows (hidden)
-        for key_id in range(1, 9):
-            w = LimboWindow(key_id, self)
+        # key windows still to build in idle time (see prewarm)
+        self._unbuilt = iter(range(1, self.key_count + 1))
+
+        # initialize position maps (row‑major, key n on position n)
+        home = [(p, p) for p in range(1, self.key_count + 1)]
+        self.pos_to_key = SlotMap(self.key_count, home)
+        self.key_to_pos = SlotMap(self.key_count, home)
+
+    @property
+    def layout(self):
+        """The GridLayout for this screen, worked out on first use."""
+        if self._layout is None:
+            self._layout = GridLayout(self.rows, self.cols,
+                                      self.backend.screen_size(self.master))
+        return self._layout
+
+    @property
+    def overlay(self):
+        """The shared canvas (render_mode="canvas"), made on first use."""
+        if self._overlay is None:
+            self._overlay = Overlay(self.backend, self.master)
+        return self._overlay
+
+    @property
+    def xy_positions(self):
+        """Screen-space target for each position."""
+        return self.layout.positions
+
+    def window(self, key_id):
+        """The key's LimboWindow, created (hidden) the first time it's needed."""
+        w = self.windows.get(key_id)
+        if w is None:
+            key_class = LimboSprite if self.render_mode == "canvas" else LimboWindow
+            w = self.windows[key_id] = key_class(key_id, self, size=self.layout.key_size)
             w.root.withdraw()
-            self.windows[key_id] = w
-
-        # 2) initialize position maps (row‑major 1…8)
-        self.pos_to_key = {
-            1: 1, 2: 2,
-            3: 3, 4: 4,
-            5: 5, 6: 6,
-            7: 7, 8: 8,
-        }
-        self.key_to_pos = {k: p for p, k in self.pos_to_key.items()}
+        return w
+
+    def prewarm(self):
+        """
+        Build the shared fade frames, then the key windows (hidden) one per
+        idle pass; window() makes any needed sooner. Call it once the menu
+        is up: idle handlers are shared by every Tk interpreter on the
+        thread, so any update_idletasks() would otherwise run all of it.
+        """
+        self.master.after_idle(lambda: LimboWindow.atlas.warm(self.master,
+                                                              self.backend.photo_image,
+                                                              self.layout.key_size))
+        self.master.after_idle(self._prewarm)
+
+    def _prewarm(self):
+        for key_id in self._unbuilt:
+            if key_id in self.key_to_pos and key_id not in self.windows:
+                self.window(key_id)
+                self.master.after_idle(self._prewarm)
+                return
 
     def open(self, key_id):
-        """Show (or re-show) a pre-created window."""
-        if key_id in self.windows:
-            self.windows[key_id].show()
-            return self.windows[key_id]
-        # fallback (shouldn't happen)
-        w = LimboWindow(key_id, self)
-        self.windows[key_id] = w
+        """Show (or re-show) a key window."""
+        w = self.window(key_id)
         w.show()
         return w
 
@@ -156,8 +327,8 @@ class KeyManager:
 
     def change_colour(self, key_id, on_off):
         """Fade overlay in or out."""
-        if key_id in self.windows:
-            self.windows[key_id].change_colour(on_off)
+        if key_id in self.key_to_pos:
+            self.window(key_id).change_colour(on_off)
 
     def swap_keys(self, key1, key2, on_complete=None):
         """
@@ -176,10 +347,10 @@ class KeyManager:
         self.key_to_pos[key1], self.key_to_pos[key2] = pos2, pos1
 
         # find target coordinates
-        x1, y1 = xy_positions[pos1]
-        x2, y2 = xy_positions[pos2]
-        w1 = self.windows[key1]
-        w2 = self.windows[key2]
+        x1, y1 = self.xy_positions[pos1]
+        x2, y2 = self.xy_positions[pos2]
+        w1 = self.window(key1)
+        w2 = self.window(key2)
 
         # animate key1 → pos2, then key2 → pos1 (or vice versa)
         # def _move2():
@@ -192,9 +363,7 @@ class KeyManager:
         #                         on_complete=_move2)
 
 
-        windowMove.moveWindowTo(w1.root, x2, y2, curve=self.curve, overshoot=self.overshoot, duration=self.move_duration)
-        windowMove.moveWindowTo(w2.root, x1, y1, curve=self.curve, overshoot=self.overshoot, duration=self.move_duration, 
-                                on_complete=on_complete)
+        self._move_batch([(w1.root, (x2, y2)), (w2.root, (x1, y1))], on_complete)
         
         self.debug_maps()
 
@@ -204,7 +373,7 @@ class KeyManager:
         on_complete optional callback after the move finishes.
         """
         # bounds-check
-        if key not in self.key_to_pos or new_pos not in xy_positions:
+        if key not in self.key_to_pos or new_pos not in self.xy_positions:
             return
 
         old_pos = self.key_to_pos[key]
@@ -219,8 +388,8 @@ class KeyManager:
         self.key_to_pos[key]      = new_pos
 
         # animate
-        x, y = xy_positions[new_pos]
-        windowMove.moveWindowTo(self.windows[key].root, x, y, duration=self.move_duration,
+        x, y = self.xy_positions[new_pos]
+        windowMove.moveWindowTo(self.window(key).root, x, y, duration=self.move_duration,
                                 curve=self.curve, overshoot=self.overshoot,
                                 on_complete=on_complete)
         
@@ -246,29 +415,11 @@ class KeyManager:
                 self.pos_to_key[pos] = key
                 self.key_to_pos[key] = pos
 
-        def _safe_move(window, x, y, on_complete):
-            # current coords
-            cx, cy = window.winfo_x(), window.winfo_y()
-            if cx == x and cy == y:
-                # no movement needed—fire callback on next idle
-                if on_complete:
-                    window.after(0, on_complete)
-            else:
-                # real move
-                windowMove.moveWindowTo(window, x, y, duration=self.move_duration,
-                                        curve=self.curve, overshoot=self.overshoot,
-                                        on_complete=on_complete)
-
-        # inside KeyManager.rotate_keys (and analogously in swap_keys, splitRotate, etc)
-        n = len(positions)
-        for i, (pos, key) in enumerate(zip(positions, shifted_keys), start=1):
-            if key is None: 
-                continue
-            
-            x, y = xy_positions[pos]
-            cb = on_complete if i == n else None
-            # in rotate_keys, swap_keys, move_key_to...
-            _safe_move(self.windows[key].root, x, y, cb)
+        # 4) Animate every key that has to move as one batch
+        self._move_batch([(self.window(key).root, self.xy_positions[pos])
+                          for pos, key in zip(positions, shifted_keys)
+                          if key is not None],
+                         on_complete)
 
         self.debug_maps()
 
@@ -282,9 +433,73 @@ class KeyManager:
         #         x, y = xy_positions[pos]
         #         windowMove.moveWindowTo(self.windows[key].root, x, y, curve=True, overshoot=True, on_complete=on_complete)
 
+    def _move_batch(self, targets, on_complete=None):
+        """
+        Animate [(window, (x, y)), ...] together on one shared trajectory.
+        Windows already at (or heading to) their target are left alone;
+        on_complete fires once everything has landed.
+        """
+        moves, heading = [], None
+        for window, (x, y) in targets:
+            tween = windowMove.currentTween(window)
+            if tween is not None and (tween.to_x, tween.to_y) == (x, y):
+                heading = tween
+                continue
+            cx, cy = windowMove.currentPosition(window)
+            if (cx, cy) != (x, y):
+                moves.append((window, [(cx, cy), (x, y)]))
+
+        if moves:
+            windowMove.moveMany(moves, duration=self.move_duration,
+                                curve=self.curve, overshoot=self.overshoot,
+                                on_complete=on_complete)
+        elif on_complete and heading is not None:
+            # no movement needed—fire callback once it has landed
+            heading.add_callback(on_complete)
+        elif on_complete:
+            self.master.after(0, on_complete)
+
+    def move_along_paths(self, paths, duration=None, on_complete=None):
+        """
+        Play a compiled stage: paths[p] lists every position the key now on
+        p passes through. Maps jump straight to the end of the stage and
+        each key moves through its waypoints as a single animation.
+        on_complete fires once the last key lands.
+        """
+        duration = duration or self.move_duration
+        # stages only list keys that move, so this is O(moved keys)
+        moving = [(self.pos_to_key[p], path) for p, path in paths.items()
+                  if p in self.pos_to_key and len(set(path)) > 1]
+
+        # 1) update the maps in one go
+        for key, path in moving:
+            self.pos_to_key.pop(path[0], None)
+        for key, path in moving:
+            self.pos_to_key[path[-1]] = key
+            self.key_to_pos[key] = path[-1]
+
+        # 2) animate, starting each window from wherever it really is
+        if not moving:
+            if on_complete:
+                self.master.after(0, on_complete)
+            return
+        moves = []
+        for key, path in moving:
+            window = self.window(key).root
+            points = [windowMove.currentPosition(window)] + [self.xy_positions[p] for p in path[1:]]
+            moves.append((window, points))
+        # one shared trajectory table for the whole stage
+        windowMove.moveMany(moves, duration=duration,
+                            curve=self.curve, overshoot=self.overshoot,
+                            on_complete=on_complete)
+
+        self.debug_maps()
+
     def debug_maps(self):
-        print("pos_to_key:", self.pos_to_key)
-        print("key_to_pos:", self.key_to_pos)
+        # runs on every move: only format anything when DEBUG is on
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("pos_to_key: %s", self.pos_to_key)
+            log.debug("key_to_pos: %s", self.key_to_pos)
 
 
 def demo():
@@ -301,43 +516,44 @@ def demo():
     # kick off the mainloop once
     mgr.master.mainloop()
 
-def createWidgetsOnMain():
-    global window_height, window_width, bg_img, pil_img, image_label, play_button, settings_button, root, resized_img, sound_path, folder, img_path, resample_filter
+def createWidgetsOnMain(backend):
+    global window_height, window_width, bg_img, image_label, play_button, settings_button, root, resized_img, sound_path, folder, img_path
     root.title("Limbo Windows - by Yinnotayl")
     root.geometry(f"{window_width}x{window_height}")
 
-    try:
-        resample_filter = Image.Resampling.LANCZOS
-    except AttributeError:
-        resample_filter = Image.LANCZOS
-
-    resized_img = pil_img.resize((window_width, window_height),
-                                 resample=resample_filter)
+    # decoded + LANCZOS-resized once, then served from the disk cache
+    resized_img = asset_cache.load_image(img_path, size=(window_width, window_height))
 
     # 5) Convert it into a PhotoImage bound to our root
-    bg_img = ImageTk.PhotoImage(resized_img, master=root)
+    bg_img = backend.photo_image(resized_img, root)
 
     # 6) Display it in a Label at (0,0)
-    image_label = Label(root,
-                        image=bg_img,
-                        borderwidth=0,
-                        highlightthickness=0)
+    image_label = backend.label(root,
+                                image=bg_img,
+                                borderwidth=0,
+                                highlightthickness=0)
     image_label.place(x=0, y=0)
 
     # 7) Keep a reference so it doesn’t get garbage‑collected
     image_label.image = bg_img
 
-    play_button = Button(root, text="Start", font="Arial 20", command=lambda: setup())
+    play_button = backend.button(root, text="Start", font="Arial 20", command=lambda: setup())
     play_button.place(x=window_width // 2 - 50, y=window_height - 160)
 
-    settings_button = Button(root, text="Settings", font="Arial 20", command=lambda: show_Settings())
+    settings_button = backend.button(root, text="Settings", font="Arial 20", command=lambda: show_Settings())
     settings_button.place(x=window_width // 2 + 50, y=window_height - 160)
 
-def main_menu():
-    global mgr, root, folder, img_path, pil_img, sound_path, window_width, window_height
-    mgr = KeyManager(move_duration=320, curve=True, overshoot=False)
+def build_main_menu(backend=None):
+    """
+    Create the key manager and the menu window, without entering the loop.
+    `backend` defaults to real Tk (see window_backend).
+    """
+    global mgr, root, folder, img_path, sound_path, window_width, window_height
+    backend = backend or TkBackend()
+    mgr = KeyManager(move_duration=320, curve=True, overshoot=False, backend=backend,
+                     render_mode=render_mode)
     # 1) Create your window at the size you want
-    root = Tk()
+    root = backend.create_root()
     root.title("Limbo Windows - by Yinnotayl")
     window_width, window_height = 834, 495
     root.geometry(f"{window_width}x{window_height}")
@@ -360,17 +576,30 @@ def main_menu():
     # 2) Force the window to realize its size
     root.update_idletasks()
 
-    # 3) Load your source image
+    # 3) Locate your source image
     folder     = os.path.dirname(os.path.abspath(__file__))
     img_path   = os.path.join(folder, "limbo_logo.png")
-    pil_img    = Image.open(img_path).convert("RGBA")
 
     # Loading the sound file
     sound_path = os.path.join(folder, "limbo_music_audio.mp3")
 
+    # beat map for the moves: analysed once per asset, off the Tk thread
+    def onBeats(beats):
+        global music_beats
+        music_beats = beats
+    beat_map.load_async(sound_path, root, onBeats)
+
     # 4) Resize the image to exactly your window’s client area
     #    (we already know window_width & window_height)
-    createWidgetsOnMain()
+    createWidgetsOnMain(backend)
+
+    # 5) only now queue the key windows and fade frames, so the menu's own
+    #    idle redraws run first
+    root.after(0, mgr.prewarm)
+    return root
+
+def main_menu():
+    build_main_menu()
 
     # 8) Run the GUI
     root.mainloop()
@@ -383,26 +612,15 @@ def show_Settings():
     settings_label = Label(settings, text="Settings will be here soon!", font="Arial 16")
     settings_label.pack(pady=20)
 
-screen = Tk()
-screen.withdraw()
-width  = screen.winfo_screenwidth()
-height = screen.winfo_screenheight()
-h_spacing = 100
-v_spacing = height // 8
-xy_positions = {1: (width - (h_spacing + 120) * 2, v_spacing),
-                2: (width - (h_spacing + 120) * 1, v_spacing), 
-                3: (width - (h_spacing + 120) * 2, (v_spacing + 84) * 2 - 84),
-                4: (width - (h_spacing + 120) * 1, (v_spacing + 84) * 2 - 84), 
-                5: (width - (h_spacing + 120) * 2, (v_spacing + 84) * 3 - 84),
-                6: (width - (h_spacing + 120) * 1, (v_spacing + 84) * 3 - 84), 
-                7: (width - (h_spacing + 120) * 2, (v_spacing + 84) * 4 - 84), 
-                8: (width - (h_spacing + 120) * 1, (v_spacing + 84) * 4 - 84)}
-screen.destroy()
+# LIMBO_RENDER=canvas draws the keys on one overlay instead of 8 windows
+render_mode = os.environ.get("LIMBO_RENDER", "windows")
+music_beats = None    # beat_map.BeatMap once the music has been analysed
 correct_key = random.randint(1, 8)
 key_positions = {1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8}
 
 def moveKeyToPosition(key, position):
-    windowMove.moveWindowTo(key.root, xy_positions[position][0], xy_positions[position][1], curve=True, overshoot=True)    
+    x, y = key.manager.xy_positions[position]
+    windowMove.moveWindowTo(key.root, x, y, curve=True, overshoot=True)    
     
 def setup():
     global mgr
@@ -445,14 +663,14 @@ def setup():
         w1 = w2 = w3 = w4 = w5 = w6 = w7 = w8 = None
 
     if any([w1, w2, w3, w4, w5, w6, w7, w8]):
-        windowMove.moveWindowTo(w1.root, xy_positions[1][0], xy_positions[1][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w2.root, xy_positions[2][0], xy_positions[2][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w3.root, xy_positions[3][0], xy_positions[3][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w4.root, xy_positions[4][0], xy_positions[4][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w5.root, xy_positions[5][0], xy_positions[5][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w6.root, xy_positions[6][0], xy_positions[6][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w7.root, xy_positions[7][0], xy_positions[7][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w8.root, xy_positions[8][0], xy_positions[8][1], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w1.root, *mgr.xy_positions[1], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w2.root, *mgr.xy_positions[2], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w3.root, *mgr.xy_positions[3], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w4.root, *mgr.xy_positions[4], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w5.root, *mgr.xy_positions[5], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w6.root, *mgr.xy_positions[6], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w7.root, *mgr.xy_positions[7], curve=True, overshoot=True)
+        windowMove.moveWindowTo(w8.root, *mgr.xy_positions[8], curve=True, overshoot=True)
 
     if mgr:
         mgr.master.after(delay, lambda: mgr.change_colour(correct_key, True))
@@ -465,6 +683,8 @@ def setup():
 class MovementsManager():
     def __init__(self, mgr):
         self.mgr = mgr
+        # the 16 moves, generated for this manager's grid
+        self.moveset = move_compiler.for_grid(mgr.rows, mgr.cols)
         self.moves = {
             1: self.rotateAllLeft,
             2: self.rotateAllRight,
@@ -484,70 +704,93 @@ class MovementsManager():
             16: self.swapRightLeft,
         }
 
+    def run_move(self, move_id, oncomplete=None, duration=None):
+        """
+        Play one move from the grid's move table (move_compiler.grid_moves).
+        All of its rotations and swaps go out as a single batch of windows,
+        taking `duration` ms (default: the manager's move_duration).
+        """
+        traced = instrument.enabled
+        if traced:
+            t0 = instrument.now()
+        if move_id not in self.moveset.stages:
+            raise ValueError(f"unknown move-ID {move_id!r}")
+        stage = self.moveset.stages[move_id]
+        self.mgr.move_along_paths(stage.paths, duration=duration, on_complete=oncomplete)
+        if traced:
+            instrument.span("move", t0, args={"moves": [move_id]})
+
+    def play(self, move_keys, on_complete=None, max_merge=4):
+        """
+        Run the given move-IDs back to back, then call on_complete.
+        The sequence is compiled first, so runs of the same move play as
+        one multi-step animation instead of one stage per move.
+        """
+        compiled = self.moveset.compile(move_keys, max_merge=max_merge)
+        stages = compiled.stages
+
+        # helper that runs only once
+        def once(fn):
+            called = False
+            @wraps(fn)
+            def wrapper(*a, **kw):
+                nonlocal called
+                if not called:
+                    called = True
+                    fn(*a, **kw)
+            return wrapper
+
+        # recursive runner
+        def run_next(i=0):
+            if i == len(stages):
+                if on_complete:
+                    on_complete()
+                return
+            cb = once(lambda: run_next(i+1))
+            traced = instrument.enabled
+            if traced:
+                t0 = instrument.now()
+            self.mgr.move_along_paths(stages[i].paths,
+                                      duration=self.mgr.move_duration * len(stages[i].moves),
+                                      on_complete=cb)
+            if traced:
+                instrument.span("move", t0, args={"moves": list(stages[i].moves)})
+
+        run_next()
+        return compiled
+
     def rotateAllLeft(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 4, 6, 8, 7, 5, 3], clockwise=False, on_complete=oncomplete)
+        self.run_move(1, oncomplete)
     def rotateAllRight(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 4, 6, 8, 7, 5, 3], clockwise=True, on_complete=oncomplete)
+        self.run_move(2, oncomplete)
     def centerRotateLeft(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 4, 3], clockwise=False)
-        self.mgr.rotate_keys([5, 6, 8, 7], clockwise=True, on_complete=oncomplete)
+        self.run_move(3, oncomplete)
     def centerRotateRight(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 4, 3], clockwise=True)
-        self.mgr.rotate_keys([5, 6, 8, 7], clockwise=False, on_complete=oncomplete)
+        self.run_move(4, oncomplete)
     def rotateSegmentsLeft(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 3, 4], clockwise=False)
-        self.mgr.rotate_keys([5, 6, 7, 8], clockwise=False, on_complete=oncomplete)
+        self.run_move(5, oncomplete)
     def rotateSegmentsRight(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 3, 4], clockwise=True)
-        self.mgr.rotate_keys([5, 6, 7, 8], clockwise=True, on_complete=oncomplete)
+        self.run_move(6, oncomplete)
     def splitRotateSwapLeft(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 3], clockwise=True)
-        mgr.swap_keys(4, 5)
-        self.mgr.rotate_keys([6, 8, 7], clockwise=True, on_complete=oncomplete)
+        self.run_move(7, oncomplete)
     def splitRotateSwapRight(self, oncomplete=None):
-        self.mgr.rotate_keys([1, 2, 4], clockwise=False)
-        mgr.swap_keys(3, 6)
-        self.mgr.rotate_keys([5, 8, 7], clockwise=False, on_complete=oncomplete)
+        self.run_move(8, oncomplete)
     def bottomUp(self, oncomplete=None):
-        self.mgr.swap_keys(1, 5)
-        self.mgr.swap_keys(2, 6)
-        self.mgr.swap_keys(3, 7)
-        self.mgr.swap_keys(4, 8, on_complete=oncomplete)
+        self.run_move(9, oncomplete)
     def topDown(self, oncomplete=None):
-        self.mgr.swap_keys(5, 1)
-        self.mgr.swap_keys(6, 2)
-        self.mgr.swap_keys(7, 3)
-        self.mgr.swap_keys(8, 4, on_complete=oncomplete)
+        self.run_move(10, oncomplete)
     def spinTop(self, oncomplete=None):
-        self.mgr.swap_keys(1, 8)
-        self.mgr.swap_keys(2, 7)
-        self.mgr.swap_keys(3, 6)
-        self.mgr.swap_keys(4, 5, on_complete=oncomplete)
+        self.run_move(11, oncomplete)
     def spinBottom(self, oncomplete=None):
-        self.mgr.swap_keys(8, 1)
-        self.mgr.swap_keys(7, 2)
-        self.mgr.swap_keys(6, 3)
-        self.mgr.swap_keys(5, 4, on_complete=oncomplete)
+        self.run_move(12, oncomplete)
     def swapSegmentCentersLeft(self, oncomplete=None):
-        self.mgr.swap_keys(1, 4)
-        self.mgr.swap_keys(2, 3)
-        self.mgr.swap_keys(5, 8)
-        self.mgr.swap_keys(6, 7, on_complete=oncomplete)
+        self.run_move(13, oncomplete)
     def swapSegmentCentersRight(self, oncomplete=None):
-        self.mgr.swap_keys(4, 1)
-        self.mgr.swap_keys(3, 2)
-        self.mgr.swap_keys(8, 5)
-        self.mgr.swap_keys(7, 6, on_complete=oncomplete)
+        self.run_move(14, oncomplete)
     def swapLeftRight(self, oncomplete=None):
-        self.mgr.swap_keys(1, 2)
-        self.mgr.swap_keys(3, 4)
-        self.mgr.swap_keys(5, 6)
-        self.mgr.swap_keys(7, 8, on_complete=oncomplete)
+        self.run_move(15, oncomplete)
     def swapRightLeft(self, oncomplete=None):
-        self.mgr.swap_keys(2, 1)
-        self.mgr.swap_keys(4, 3)
-        self.mgr.swap_keys(6, 5)
-        self.mgr.swap_keys(8, 7, on_complete=oncomplete)
+        self.run_move(16, oncomplete)
 
 # def game():
 #     global mgr
@@ -592,56 +835,37 @@ def game():
     move_keys = random.choices(list(mm.moves.keys()), k=25)
     print("Move sequence:", move_keys)
 
-    # 2) build your functions list from those keys
-    move_funcs = [mm.moves[k] for k in move_keys]
-
-    # helper that runs only once
-    def once(fn):
-        called = False
-        @wraps(fn)
-        def wrapper(*a, **kw):
-            nonlocal called
-            if not called:
-                called = True
-                fn(*a, **kw)
-        return wrapper
-
-    # recursive runner
-    def run_next(i=0):
-        if i == len(move_funcs):
-            print("All 25 moves done.")
-            mgr.master.after(1000, lambda: mgr.change_colour(correct_key, True))
-            mgr.master.after(1000 + 800, lambda: mgr.change_colour(correct_key, False))
-            return
-        cb = once(lambda: run_next(i+1))
-        move_funcs[i](oncomplete=cb)
-
-    run_next()
-
-    # End of the game
-    if mgr:
-        w1 = mgr.open(1)
-        w2 = mgr.open(2)
-        w3 = mgr.open(3)
-        w4 = mgr.open(4)
-        w5 = mgr.open(5)
-        w6 = mgr.open(6)
-        w7 = mgr.open(7)
-        w8 = mgr.open(8)
+    # 2) play them on the track's beat timing (or back to back without a beat
+    #    map), then reveal the key
+    def reveal():
+        print("All 25 moves done.")
+        mgr.master.after(1000, lambda: mgr.change_colour(correct_key, True))
+        mgr.master.after(1000 + 800, lambda: mgr.change_colour(correct_key, False))
+
+    start = mgr.key_to_pos[correct_key]
+    if music_beats:
+        # nothing plays the music yet, so the beat grid starts now at the
+        # top of the track; once there is audio output, at_ms must be the
+        # player's current position
+        beat_map.BeatScheduler(mm, music_beats).start(move_keys, at_ms=0, on_complete=reveal)
+        compiled = None
     else:
-        w1 = w2 = w3 = w4 = w5 = w6 = w7 = w8 = None
+        compiled = mm.play(move_keys, on_complete=reveal)
 
-    if any([w1, w2, w3, w4, w5, w6, w7, w8]):
-        windowMove.moveWindowTo(w1.root, xy_positions[1][0], xy_positions[1][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w2.root, xy_positions[2][0], xy_positions[2][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w3.root, xy_positions[3][0], xy_positions[3][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w4.root, xy_positions[4][0], xy_positions[4][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w5.root, xy_positions[5][0], xy_positions[5][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w6.root, xy_positions[6][0], xy_positions[6][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w7.root, xy_positions[7][0], xy_positions[7][1], curve=True, overshoot=True)
-        windowMove.moveWindowTo(w8.root, xy_positions[8][0], xy_positions[8][1], curve=True, overshoot=True)
-    windowMove.moveWindowTo(w1.root, xy_positions[1][0], xy_positions[1][1], curve=True, overshoot=True)
+    # 3) the answer, for debugging only (LIMBO_LOG=debug)
+    if log.isEnabledFor(logging.DEBUG):
+        compiled = compiled or mm.moveset.compile(move_keys)
+        log.debug("key %s path: %s (%d stages)", correct_key,
+                  compiled.track(start), len(compiled.stages))
 
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    # LIMBO_LOG=debug prints the position maps after every move
+    logging.basicConfig(level=os.environ.get("LIMBO_LOG", "WARNING").upper())
+    trace_path = os.environ.get("LIMBO_TRACE")
+    if trace_path:
+        instrument.enable()
+    main_menu()
+    if trace_path:
+        instrument.export_chrome_trace(trace_path)
+        print(instrument.format_summary())
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""
+MovementsManager moves as permutations of the key positions.
+
+Every move only ever rotates or swaps fixed positions, so a whole move
+sequence collapses into one permutation. From that we know the final
+layout and where any key ends up without touching Tk, and runs of the
+same move can be played as a single multi-step animation.
+
+The 16 move families are generated for any rows × cols grid (see
+grid_moves); the default 4 × 2 grid gives the original 8-key moves.
+
+Permutations are tuples `dest` indexed by position (index 0 unused):
+the key standing on position p moves to dest[p].
+"""
+import random
+from collections import namedtuple
+from functools import lru_cache
+
+
+def _ring(cols, r0, r1, c0, c1):
+    """Outline of the block rows r0…r1 × cols c0…c1, clockwise from its top-left."""
+    def pos(r, c):
+        return r * cols + c + 1
+    if r0 == r1:
+        return tuple(pos(r0, c) for c in range(c0, c1 + 1))
+    if c0 == c1:
+        return tuple(pos(r, c0) for r in range(r0, r1 + 1))
+    return (tuple(pos(r0, c) for c in range(c0, c1 + 1))
+            + tuple(pos(r, c1) for r in range(r0 + 1, r1 + 1))
+            + tuple(pos(r1, c) for c in range(c1 - 1, c0 - 1, -1))
+            + tuple(pos(r, c0) for r in range(r1 - 1, r0, -1)))
+
+
+def _rings(cols, r0, r1, c0, c1):
+    """Concentric rings of a block, outermost first (single cells left out)."""
+    rings = []
+    while r0 <= r1 and c0 <= c1:
+        ring = _ring(cols, r0, r1, c0, c1)
+        if len(ring) > 1:
+            rings.append(ring)
+        r0, r1, c0, c1 = r0 + 1, r1 - 1, c0 + 1, c1 - 1
+    return rings
+
+
+def _rotate(positions, clockwise):
+    return [("rotate", tuple(positions), clockwise)] if len(positions) > 1 else []
+
+
+def _swaps(pairs, flip=False):
+    return [("swap", (b, a) if flip else (a, b)) for a, b in pairs]
+
+
+def grid_moves(rows=4, cols=2):
+    """
+    move-ID → (name, ops) for a rows × cols grid. The grid is split into
+    a top and a bottom half of rows // 2 rows each (an odd middle row
+    stays out of the half-based moves):
+
+      rotateAll*         every concentric ring of the grid
+      centerRotate*      the rings of each half, in opposite directions
+      rotateSegments*    each half in reading order
+      splitRotateSwap*   each half's rings, minus one cell per half
+                         that is swapped across the split instead
+      bottomUp/topDown   the two halves trade places
+      spin*              180° turn of the whole grid
+      swapSegmentCenters* each half reversed
+      swapLeftRight*     columns mirrored
+    """
+    if rows < 2 or cols < 2:
+        raise ValueError(f"moves need at least a 2x2 grid, got {rows}x{cols}")
+    n = rows * cols
+    half = rows // 2
+    top = (0, half - 1, 0, cols - 1)
+    bottom = (rows - half, rows - 1, 0, cols - 1)
+    top_cells = list(range(1, half * cols + 1))
+    bottom_cells = list(range(n - half * cols + 1, n + 1))
+    top_rings, bottom_rings = _rings(cols, *top), _rings(cols, *bottom)
+    everything = _rings(cols, 0, rows - 1, 0, cols - 1)
+
+    def rotate_all(rings, clockwise):
+        return [op for ring in rings for op in _rotate(ring, clockwise)]
+
+    def split_rotate_swap(top_out, bottom_out, clockwise):
+        # the outer rings lose one cell each; those two cells swap instead
+        return (_rotate([p for p in top_rings[0] if p != top_out], clockwise)
+                + rotate_all(top_rings[1:], clockwise)
+                + _swaps([(top_out, bottom_out)])
+                + _rotate([p for p in bottom_rings[0] if p != bottom_out], clockwise)
+                + rotate_all(bottom_rings[1:], clockwise))
+
+    halves = list(zip(top_cells, bottom_cells))
+    spin = [(p, n + 1 - p) for p in range(1, n // 2 + 1)]
+    centers = [(cells[i], cells[-1 - i]) for cells in (top_cells, bottom_cells)
+               for i in range(len(cells) // 2)]
+    mirror = [(r * cols + c + 1, r * cols + cols - c) for r in range(rows)
+              for c in range(cols // 2)]
+
+    return {
+        1: ("rotateAllLeft", rotate_all(everything, False)),
+        2: ("rotateAllRight", rotate_all(everything, True)),
+        3: ("centerRotateLeft", rotate_all(top_rings, False) + rotate_all(bottom_rings, True)),
+        4: ("centerRotateRight", rotate_all(top_rings, True) + rotate_all(bottom_rings, False)),
+        5: ("rotateSegmentsLeft", _rotate(top_cells, False) + _rotate(bottom_cells, False)),
+        6: ("rotateSegmentsRight", _rotate(top_cells, True) + _rotate(bottom_cells, True)),
+        # top half's bottom-right ↔ bottom half's top-left
+        7: ("splitRotateSwapLeft", split_rotate_swap(top_cells[-1], bottom_cells[0], True)),
+        # top half's bottom-left ↔ bottom half's top-right
+        8: ("splitRotateSwapRight", split_rotate_swap(top_cells[-cols], bottom_cells[cols - 1], False)),
+        9: ("bottomUp", _swaps(halves)),
+        10: ("topDown", _swaps(halves, flip=True)),
+        11: ("spinTop", _swaps(spin)),
+        12: ("spinBottom", _swaps(spin, flip=True)),
+        13: ("swapSegmentCentersLeft", _swaps(centers)),
+        14: ("swapSegmentCentersRight", _swaps(centers, flip=True)),
+        15: ("swapLeftRight", _swaps(mirror)),
+        16: ("swapRightLeft", _swaps(mirror, flip=True)),
+    }
+
+
+def compose(first, then):
+    """Permutation doing `first` and then `then`."""
+    return tuple(then[d] for d in first)
+
+
+def op_perm(op, size=8):
+    dest = list(range(size + 1))
+    if op[0] == "rotate":
+        _, positions, clockwise = op
+        n = len(positions)
+        step = 1 if clockwise else -1
+        for i, p in enumerate(positions):
+            dest[p] = positions[(i + step) % n]
+    elif op[0] == "swap":
+        a, b = op[1]
+        dest[a], dest[b] = b, a
+    else:
+        raise ValueError(f"unknown move operation {op[0]!r}")
+    return tuple(dest)
+
+
+# One animation stage: `moves` consecutive move-IDs played as one tween per
+# key. paths[p] is every position the key starting on p visits, in order;
+# keys the stage leaves where they are have no entry.
+Stage = namedtuple("Stage", "moves paths")
+
+
+class MoveSet:
+    """The 16 moves of one grid, as permutations. Get one via for_grid()."""
+
+    def __init__(self, rows=4, cols=2):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.positions = tuple(range(1, self.size + 1))
+        self.identity = (0,) + self.positions
+        self.moves = grid_moves(rows, cols)
+        self.perms = {}
+        for move_id, (_, ops) in self.moves.items():
+            perm = self.identity
+            for op in ops:
+                perm = compose(perm, op_perm(op, self.size))
+            self.perms[move_id] = perm
+
+        # single-move stages, built once: only the keys a move shifts get
+        # a path, so playing a move is O(moved keys) rather than O(grid)
+        self.stages = {move_id: Stage((move_id,), {p: (p, d) for p, d in enumerate(perm) if d != p})
+                       for move_id, perm in self.perms.items()}
+
+    def final_position(self, move_ids, pos):
+        """Where the key starting on `pos` ends up. O(len(move_ids))."""
+        for move_id in move_ids:
+            pos = self.perms[move_id][pos]
+        return pos
+
+    def compile(self, move_ids, max_merge=4):
+        """
+        Compile move-IDs into their composed permutation and animation
+        stages. Runs of the same move (up to `max_merge` long) share one
+        stage, e.g. two rotateAllLeft become a single two-step rotation.
+        """
+        move_ids = list(move_ids)
+        for move_id in move_ids:
+            if move_id not in self.perms:
+                raise ValueError(f"unknown move-ID {move_id!r}")
+
+        perm = self.identity
+        stages = []
+        run = []
+        for i, move_id in enumerate(move_ids):
+            perm = compose(perm, self.perms[move_id])
+            run.append(move_id)
+            nxt = move_ids[i + 1] if i + 1 < len(move_ids) else None
+            if nxt != move_id or len(run) >= max_merge:
+                stages.append(self._stage(run))
+                run = []
+        return CompiledSequence(move_ids, perm, stages, self.perms)
+
+    def _stage(self, run):
+        # a run repeats one move, so the keys it moves are exactly the
+        # ones that move shifts
+        move_id = run[0]
+        if len(run) == 1:
+            return self.stages[move_id]
+        perm = self.perms[move_id]
+        paths = {}
+        for start in self.stages[move_id].paths:
+            pos, path = start, [start]
+            for _ in run:
+                pos = perm[pos]
+                path.append(pos)
+            paths[start] = tuple(path)
+        return Stage(tuple(run), paths)
+
+
+@lru_cache(maxsize=None)
+def for_grid(rows=4, cols=2):
+    """The (shared) MoveSet for a rows × cols grid."""
+    return MoveSet(rows, cols)
+
+
+class CompiledSequence:
+    def __init__(self, moves, perm, stages, perms):
+        self.moves = moves
+        self.perm = perm
+        self.stages = stages
+        self._perms = perms
+
+    def final_layout(self, pos_to_key):
+        """(pos_to_key, key_to_pos) after the whole sequence."""
+        after = {self.perm[p]: k for p, k in pos_to_key.items()}
+        return after, {k: p for p, k in after.items()}
+
+    def track(self, pos):
+        """Positions visited by the key starting on `pos`, one per move."""
+        path = [pos]
+        for move_id in self.moves:
+            pos = self._perms[move_id][pos]
+            path.append(pos)
+        return path
+
+
+# the original 8-key game
+DEFAULT = for_grid(4, 2)
+MOVES = DEFAULT.moves
+
+
+def final_position(move_ids, pos, moveset=DEFAULT):
+    """Where the key starting on `pos` ends up. O(len(move_ids))."""
+    return moveset.final_position(move_ids, pos)
+
+
+def compile_moves(move_ids, max_merge=4, moveset=DEFAULT):
+    """Compile move-IDs for `moveset` (default: the 8-key grid)."""
+    return moveset.compile(move_ids, max_merge)
+
+
+def random_game(rng=random, length=25):
+    """A game()-style random move sequence."""
+    return rng.choices(list(MOVES), k=length)
@@ -0,0 +1,110 @@
+"""
+Beat map analysis and scheduling on a synthetic click track: no audio
+file, decoder package or sound device needed.
+
+    python -m unittest test_beat_map
+"""
+import math, random, unittest
+from array import array
+from types import SimpleNamespace
+
+import beat_map
+
+
+def click_track(bpm, seconds=20, offset_ms=250, sample_rate=beat_map.SAMPLE_RATE,
+                chunk=beat_map.HOP * 64):
+    """Mono 16-bit chunks with a 10 ms, 1 kHz click on every beat."""
+    n = int(seconds * sample_rate)
+    samples = array("h", bytes(2 * n))
+    click = [int(20000 * math.sin(2 * math.pi * 1000 * i / sample_rate) * (1 - i / 220))
+             for i in range(220)]
+    t = offset_ms / 1000 * sample_rate
+    while t < n:
+        start = int(t)
+        end = min(n, start + len(click))
+        samples[start:end] = array("h", click[:end - start])
+        t += 60 / bpm * sample_rate
+    return [samples[i:i + chunk] for i in range(0, n, chunk)]
+
+
+def analyse_clicks(bpm, **kwargs):
+    decoder = beat_map.StreamDecoder(source=click_track(bpm, **kwargs)).start()
+    try:
+        return beat_map.analyse(decoder, decoder.sample_rate)
+    finally:
+        decoder.stop()
+
+
+class AnalyseTest(unittest.TestCase):
+    frame_ms = beat_map.HOP * 1000 / beat_map.SAMPLE_RATE
+
+    def test_tempo_and_beat_spacing(self):
+        for bpm in (90, 120, 150):
+            with self.subTest(bpm=bpm):
+                beats = analyse_clicks(bpm)
+                self.assertAlmostEqual(beats.tempo, bpm, delta=0.5)
+                gap = 60000 / bpm
+                self.assertEqual(len(beats), 20 * bpm // 60)
+                # the first click is at 250 ms; beats land within a frame
+                self.assertLessEqual(abs(beats.beats[0] - 250), self.frame_ms)
+                for a, b in zip(beats.beats, beats.beats[1:]):
+                    self.assertLessEqual(abs(b - a - gap), self.frame_ms)
+
+    def test_silence_has_no_beats(self):
+        chunk = array("h", bytes(2 * beat_map.HOP * 64))
+        decoder = beat_map.StreamDecoder(source=[chunk] * 10).start()
+        beats = beat_map.analyse(decoder, decoder.sample_rate)
+        self.assertEqual(len(beats), 0)
+
+    def test_bytes_round_trip(self):
+        beats = analyse_clicks(120, seconds=5)
+        again = beat_map.BeatMap.from_bytes(beats.to_bytes())
+        self.assertEqual(again.beats, beats.beats)
+        self.assertEqual(again.onsets, beats.onsets)
+        self.assertEqual(again.tempo, beats.tempo)
+
+    def test_from_bytes_rejects_bad_data(self):
+        data = beat_map.BeatMap([500, 1000], [480], 120.0).to_bytes()
+        with self.assertRaises(ValueError):
+            beat_map.BeatMap.from_bytes(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            beat_map.BeatMap.from_bytes(data[:-2])
+
+
+class PlanTest(unittest.TestCase):
+
+    def scheduler(self, beats, move_duration=320):
+        mm = SimpleNamespace(mgr=SimpleNamespace(move_duration=move_duration))
+        return beat_map.BeatScheduler(mm, beats)
+
+    def assert_no_overlap(self, plan):
+        for (start, duration, _), (nxt, _, _) in zip(plan, plan[1:]):
+            self.assertLessEqual(start + duration, nxt)
+
+    def test_moves_start_on_beats_and_never_overlap(self):
+        beats = analyse_clicks(150)
+        moves = random.Random(0).choices(range(1, 17), k=25)
+        for at_ms in (0, 1000, 1234):
+            with self.subTest(at_ms=at_ms):
+                plan = self.scheduler(beats).plan(moves, at_ms)
+                self.assertEqual([m for _, _, m in plan], moves)
+                self.assertGreaterEqual(plan[0][0], at_ms)
+                self.assertTrue(all(start in beats.beats for start, _, _ in plan))
+                self.assert_no_overlap(plan)
+
+    def test_close_beats_are_skipped(self):
+        # beats every 100 ms: a 320 ms move needs min_gap_ms = 160 between starts
+        beats = beat_map.BeatMap(range(0, 10000, 100))
+        plan = self.scheduler(beats).plan([1] * 10)
+        self.assertTrue(all(b[0] - a[0] >= 160 for a, b in zip(plan, plan[1:])))
+        self.assert_no_overlap(plan)
+
+    def test_past_the_last_beat(self):
+        beats = beat_map.BeatMap([0, 500, 1000])
+        plan = self.scheduler(beats).plan([1] * 6)
+        self.assertEqual([start for start, _, _ in plan], [0, 500, 1000, 1320, 1640, 1960])
+        self.assert_no_overlap(plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
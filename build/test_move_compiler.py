@@ -0,0 +1,96 @@
+"""
+The generated move table and compiled layouts against the game itself:
+grid_moves(4, 2) must stay the original 8-key table, and a compiled
+sequence must end where a headless KeyManager really puts the keys.
+
+    python -m unittest test_move_compiler
+"""
+import random, unittest
+
+import move_compiler
+import windowMove
+from bench_limbo import make_manager
+from limbo_window import MovementsManager
+
+# the hand-written table the 8-key game shipped with
+RING = (1, 2, 4, 6, 8, 7, 5, 3)
+ORIGINAL_MOVES = {
+    1: ("rotateAllLeft", [("rotate", RING, False)]),
+    2: ("rotateAllRight", [("rotate", RING, True)]),
+    3: ("centerRotateLeft", [("rotate", (1, 2, 4, 3), False), ("rotate", (5, 6, 8, 7), True)]),
+    4: ("centerRotateRight", [("rotate", (1, 2, 4, 3), True), ("rotate", (5, 6, 8, 7), False)]),
+    5: ("rotateSegmentsLeft", [("rotate", (1, 2, 3, 4), False), ("rotate", (5, 6, 7, 8), False)]),
+    6: ("rotateSegmentsRight", [("rotate", (1, 2, 3, 4), True), ("rotate", (5, 6, 7, 8), True)]),
+    7: ("splitRotateSwapLeft", [("rotate", (1, 2, 3), True), ("swap", (4, 5)), ("rotate", (6, 8, 7), True)]),
+    8: ("splitRotateSwapRight", [("rotate", (1, 2, 4), False), ("swap", (3, 6)), ("rotate", (5, 8, 7), False)]),
+    9: ("bottomUp", [("swap", (1, 5)), ("swap", (2, 6)), ("swap", (3, 7)), ("swap", (4, 8))]),
+    10: ("topDown", [("swap", (5, 1)), ("swap", (6, 2)), ("swap", (7, 3)), ("swap", (8, 4))]),
+    11: ("spinTop", [("swap", (1, 8)), ("swap", (2, 7)), ("swap", (3, 6)), ("swap", (4, 5))]),
+    12: ("spinBottom", [("swap", (8, 1)), ("swap", (7, 2)), ("swap", (6, 3)), ("swap", (5, 4))]),
+    13: ("swapSegmentCentersLeft", [("swap", (1, 4)), ("swap", (2, 3)), ("swap", (5, 8)), ("swap", (6, 7))]),
+    14: ("swapSegmentCentersRight", [("swap", (4, 1)), ("swap", (3, 2)), ("swap", (8, 5)), ("swap", (7, 6))]),
+    15: ("swapLeftRight", [("swap", (1, 2)), ("swap", (3, 4)), ("swap", (5, 6)), ("swap", (7, 8))]),
+    16: ("swapRightLeft", [("swap", (2, 1)), ("swap", (4, 3)), ("swap", (6, 5)), ("swap", (8, 7))]),
+}
+
+GRIDS = [(4, 2), (3, 3), (5, 4), (2, 2), (6, 3)]
+
+
+class MoveTableTest(unittest.TestCase):
+
+    def test_default_grid_is_the_original_table(self):
+        self.assertEqual(move_compiler.grid_moves(4, 2), ORIGINAL_MOVES)
+
+    def test_every_move_is_a_permutation(self):
+        for rows, cols in GRIDS:
+            moveset = move_compiler.for_grid(rows, cols)
+            for move_id, perm in moveset.perms.items():
+                with self.subTest(grid=(rows, cols), move=move_id):
+                    self.assertEqual(sorted(perm[1:]), list(moveset.positions))
+
+    def test_single_move_stages_match_the_permutations(self):
+        for rows, cols in GRIDS:
+            moveset = move_compiler.for_grid(rows, cols)
+            for move_id, perm in moveset.perms.items():
+                paths = moveset.stages[move_id].paths
+                self.assertEqual(paths, {p: (p, perm[p]) for p in moveset.positions if perm[p] != p})
+
+
+class PlayTest(unittest.TestCase):
+    """Seeded games played headless against what compile() predicts."""
+
+    def play(self, grid, render_mode, seq):
+        mgr = make_manager(grid, render_mode)
+        before = dict(mgr.pos_to_key)
+        compiled = MovementsManager(mgr).play(seq)
+        mgr.backend.clock.run()
+        return mgr, before, compiled
+
+    def test_final_layout_matches_play(self):
+        rng = random.Random(0)
+        for grid in GRIDS:
+            for render_mode in ("windows", "canvas"):
+                seq = rng.choices(range(1, 17), k=25)
+                with self.subTest(grid=grid, render_mode=render_mode, seq=seq):
+                    mgr, before, compiled = self.play(grid, render_mode, seq)
+                    pos_to_key, key_to_pos = compiled.final_layout(before)
+                    self.assertEqual(dict(mgr.pos_to_key), pos_to_key)
+                    self.assertEqual(dict(mgr.key_to_pos), key_to_pos)
+                    # and every key has really landed on its slot
+                    for key, pos in key_to_pos.items():
+                        window = mgr.window(key).root
+                        self.assertEqual(windowMove.currentPosition(window), mgr.xy_positions[pos])
+
+    def test_track_matches_final_position(self):
+        moveset = move_compiler.DEFAULT
+        seq = move_compiler.random_game(random.Random(1))
+        compiled = moveset.compile(seq)
+        for pos in moveset.positions:
+            path = compiled.track(pos)
+            self.assertEqual(len(path), len(seq) + 1)
+            self.assertEqual(path[-1], moveset.final_position(seq, pos))
+            self.assertEqual(path[-1], compiled.perm[pos])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,76 +1,411 @@
 import math, time
+from functools import lru_cache
 from tkinter import *
+from tkinter import TclError
+import instrument
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """
+    NumPy, imported on the first Trajectory build so it stays out of
+    start-up. It is optional: trajectories fall back to plain Python lists.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
 def setWindowPosition(x, y, window):
     window.geometry(f"+{x}+{y}")
 
+# standard ease-in-out
+def ease_io(t):
+    return 0.5 * (1 - math.cos(math.pi * t))
+
+# back-easing for overshoot
+def ease_io_back(t, s=0.7):
+    s *= 1.525
+    if t < 0.5:
+        return ((2*t)**2 * ((s+1)*(2*t) - s)) / 2
+    p = 2*t - 2
+    return ((p**2 * ((s+1)*p + s) + 2)) / 2
+
+# easing curves by name; add more here, they only cost at table-build time
+EASINGS = {
+    "io": ease_io,
+    "back": ease_io_back,
+}
+
+def controlPoint(from_x, from_y, to_x, to_y):
+    """
+    Quadratic Bézier control point for a curved move: the midpoint shifted
+    perpendicular by 0.2*length.
+    """
+    dx, dy = to_x - from_x, to_y - from_y
+    mid_x, mid_y = (from_x + to_x)/2, (from_y + to_y)/2
+    # perpendicular unit vector
+    length = math.hypot(dx, dy)
+    if length == 0:
+        ux, uy = 0, 0
+    else:
+        ux, uy = -dy/length, dx/length
+    # control point offset 20% of total distance
+    return mid_x + ux * (length * 0.2), mid_y + uy * (length * 0.2)
+
+
+@lru_cache(maxsize=128)
+def easingTable(duration, interval, easing="io", curve=False, legs=1):
+    """
+    Per-frame lookup table for one kind of move, shared by every window
+    making it. Frame i is sampled at min(i*interval, duration) ms. Returns
+    (leg, w0, w1, w2) tuples: on frame i a window sits at
+        w0*P[leg] + w1*C[leg] + w2*P[leg+1]
+    where P are its waypoints and C the Bézier control point of each leg
+    (for straight moves w1 is 0).
+    """
+    ease = EASINGS[easing]
+    frames = max(1, math.ceil(duration / interval))
+    leg, w0, w1, w2 = [], [], [], []
+    for i in range(frames + 1):
+        t = min(i * interval / duration, 1.0)
+        # which leg are we on? overshoot past either end stays on the end leg
+        s = ease(t) * legs
+        j = min(max(int(math.floor(s)), 0), legs - 1)
+        u = s - j
+        inv = 1 - u
+        leg.append(j)
+        if curve:
+            # quadratic Bézier: B(u) = (1−u)^2 P0 + 2(1−u)u P1 + u^2 P2
+            w0.append(inv*inv); w1.append(2*inv*u); w2.append(u*u)
+        else:
+            # straight line interpolation
+            w0.append(inv); w1.append(0.0); w2.append(u)
+    return tuple(leg), tuple(w0), tuple(w1), tuple(w2)
+
+
+class Trajectory:
+    """
+    Positions of a batch of windows for every frame of one move, computed
+    up front. Each window follows its own waypoint list; all lists have the
+    same length. Ticking is then a row lookup for the whole batch.
+    """
+
+    def __init__(self, paths, duration=1000, interval=10,
+                 easing="io", curve=False):
+        self.duration = max(duration, 1)
+        self.interval = interval
+        legs = len(paths[0]) - 1
+        leg, w0, w1, w2 = easingTable(self.duration, interval, easing, curve, legs)
+        self.last = len(leg) - 1
+
+        # control point per window per leg (weight 0 when straight)
+        ctrls = [[controlPoint(*a, *b) if curve else a for a, b in zip(p, p[1:])]
+                 for p in paths]
+
+        np = _numpy()
+        if np is not None:
+            pts = np.asarray(paths, dtype=float)            # (N, legs+1, 2)
+            ctl = np.asarray(ctrls, dtype=float)            # (N, legs, 2)
+            leg = np.asarray(leg)
+            w = np.asarray((w0, w1, w2))[:, :, None, None]  # (3, F, 1, 1)
+            table = (w[0] * pts[:, leg].swapaxes(0, 1)
+                     + w[1] * ctl[:, leg].swapaxes(0, 1)
+                     + w[2] * pts[:, leg + 1].swapaxes(0, 1))
+            # int() truncation, as the per-tick maths did
+            self.rows = table.astype(int).tolist()          # (F, N, 2)
+        else:
+            self.rows = [
+                [(int(a*p[j][0] + b*c[j][0] + d*p[j+1][0]),
+                  int(a*p[j][1] + b*c[j][1] + d*p[j+1][1]))
+                 for p, c in zip(paths, ctrls)]
+                for j, a, b, d in zip(leg, w0, w1, w2)
+            ]
+
+    def frame(self, elapsed):
+        """(row index, finished) for `elapsed` seconds into the move."""
+        ms = elapsed * 1000
+        if ms >= self.duration:
+            return self.last, True
+        return min(max(int(ms / self.interval + 0.5), 0), self.last), False
+
+
+class Tween:
+    """
+    Handle for one window animation driven by a FrameClock.
+      - cancel()  → stop where it is, on_complete is dropped
+      - replace() → retarget from the current position, keeping on_complete
+    Starting a new tween on a window that is already moving replaces the
+    old one, so the latest target always wins.
+    """
+
+    def __init__(self, clock, window, trajectory, column, points,
+                 overshoot=False, curve=False, on_complete=None):
+        self.clock = clock
+        self.window = window
+        self.trajectory = trajectory
+        self.column = column
+        self.points = points
+        (self.from_x, self.from_y), (self.to_x, self.to_y) = points[0], points[-1]
+        self.duration = trajectory.duration
+        self.interval = trajectory.interval
+        self.overshoot = overshoot
+        self.curve = curve
+        self.start = clock.now()
+        self.active = True
+        self.x, self.y = points[0]   # last position sent to the window
+        # callbacks to fire when this tween lands (own + any replaced ones)
+        self._callbacks = [on_complete] if on_complete else []
+
+    def position_at(self, now):
+        """Return (x, y, finished) for the given clock time."""
+        i, done = self.trajectory.frame(now - self.start)
+        x, y = self.trajectory.rows[i][self.column]
+        return x, y, done
+
+    def add_callback(self, fn):
+        """Run `fn` when this tween (or whatever replaces it) lands."""
+        self._callbacks.append(fn)
+
+    def cancel(self):
+        """Stop the animation where it is. Pending callbacks are dropped."""
+        self._callbacks = []
+        self.clock.remove(self)
+
+    def replace(self, to_x, to_y, **kwargs):
+        """
+        Retarget this window from wherever it is now. Returns the new Tween;
+        this tween's on_complete callbacks fire when the new one lands.
+        """
+        kwargs.setdefault("duration", self.duration)
+        kwargs.setdefault("interval", self.interval)
+        kwargs.setdefault("overshoot", self.overshoot)
+        kwargs.setdefault("curve", self.curve)
+        return moveSmooth(self.window, self.x, self.y, to_x, to_y, **kwargs)
+
+
+class FrameClock:
+    """
+    One animation engine per Tk interpreter. A single after() loop ticks
+    every active tween once per frame, sends that frame's geometry updates
+    as one batch and then fires completion callbacks. When the loop falls
+    behind, late frames are dropped rather than queued.
+    """
+    _clocks = {}   # Tk root -> FrameClock
+
+    def __init__(self, root, now=time.perf_counter):
+        self.root = root
+        self.now = now
+        self.tweens = {}        # window -> active Tween
+        self.frames = 0
+        self.dropped_frames = 0
+        self._job = None
+        self._deadline = None
+
+    @classmethod
+    def for_widget(cls, widget):
+        """Return the shared clock for the interpreter `widget` lives in."""
+        root = widget._root()
+        clock = cls._clocks.get(root)
+        if clock is None:
+            clock = cls._clocks[root] = cls(root)
+        return clock
+
+    @classmethod
+    def install(cls, root, now=time.perf_counter):
+        """Create the clock for `root` with a custom time source."""
+        clock = cls._clocks[root] = cls(root, now=now)
+        return clock
+
+    @classmethod
+    def release(cls, root):
+        """Forget the clock for a root that has been destroyed."""
+        cls._clocks.pop(root, None)
+
+    def tween_for(self, window):
+        """Active tween moving `window`, or None."""
+        return self.tweens.get(window)
+
+    def start(self, moves, duration=1000, interval=10,
+              overshoot=False, curve=False, easing=None, on_complete=None):
+        """
+        Start one batch: `moves` is [(window, [(x, y), ...]), ...] with the
+        same number of waypoints for every window. on_complete is attached
+        to the last window. Returns the Tweens.
+        """
+        trajectory = Trajectory([points for _, points in moves],
+                                duration=duration, interval=interval,
+                                easing=easing or ("back" if overshoot else "io"),
+                                curve=curve)
+        tweens = []
+        for i, (window, points) in enumerate(moves):
+            cb = on_complete if i == len(moves) - 1 else None
+            tweens.append(self.add(Tween(self, window, trajectory, i, points,
+                                         overshoot=overshoot, curve=curve,
+                                         on_complete=cb)))
+        return tweens
+
+    def add(self, tween):
+        """Start `tween`, replacing whatever was moving the same window."""
+        window = tween.window
+        old = self.tweens.get(window)
+        if old is not None:
+            # replaced: the old target is abandoned but its callers still
+            # expect to hear back, so hand their callbacks to the new tween
+            tween._callbacks[:0] = old._callbacks
+            old.active = False
+        self.tweens[window] = tween
+        if self._job is None:
+            self._deadline = self.now()
+            self._job = self.root.after(0, self._tick)
+        return tween
+
+    def remove(self, tween):
+        tween.active = False
+        if self.tweens.get(tween.window) is tween:
+            del self.tweens[tween.window]
+        if not self.tweens and self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except TclError:
+                pass
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        now = self.now()
+        self.frames += 1
+        # read the flag once: a callback below may call instrument.enable()
+        traced = instrument.enabled
+        if traced:
+            t0 = instrument.now()
+            # how late after() fired compared to the frame we asked for
+            instrument.instant("timer_late", args={"ms": round(max(0.0, now - self._deadline) * 1000, 3)})
+
+        # 1) advance every tween once for this frame: one table lookup per
+        #    batch, then each window just reads its column
+        batch, finished = [], []
+        rows = {}
+        tweens = list(self.tweens.items())
+        for window, tween in tweens:
+            key = (tween.trajectory, tween.start)
+            row = rows.get(key)
+            if row is None:
+                i, done = tween.trajectory.frame(now - tween.start)
+                row = rows[key] = (tween.trajectory.rows[i], done)
+            x, y = row[0][tween.column]
+            if x != tween.x or y != tween.y:
+                batch.append((tween, x, y))
+            if row[1]:
+                finished.append(tween)
+
+        # 2) send the frame's position updates in one go
+        if traced:
+            g0 = instrument.now()
+        for tween, x, y in batch:
+            tween.x, tween.y = x, y
+            try:
+                setWindowPosition(x, y, tween.window)
+            except TclError:
+                # window was destroyed mid-animation
+                finished.append(tween)
+                tween._callbacks = []
+        if traced:
+            instrument.span("geometry", g0, args={"windows": len(batch)})
+
+        # 3) retire finished tweens, then let callbacks queue new ones
+        callbacks = []
+        for tween in finished:
+            if tween.active:
+                callbacks.extend(tween._callbacks)
+                tween._callbacks = []
+                self.remove(tween)
+        for cb in callbacks:
+            cb()
+
+        if self.tweens and self._job is None:
+            self._schedule(now)
+        if traced:
+            instrument.span("frame", t0, args={"tweens": len(tweens), "batches": len(rows)})
+
+    def _schedule(self, now):
+        step = min(t.interval for t in self.tweens.values()) / 1000
+        self._deadline += step
+        if now > self._deadline:
+            # fell behind: skip the missed frames instead of queueing them
+            missed = int((now - self._deadline) / step) + 1
+            self.dropped_frames += missed
+            if instrument.enabled:
+                instrument.instant("dropped_frames", args={"count": missed})
+            self._deadline += missed * step
+        delay = max(0, int((self._deadline - now) * 1000))
+        try:
+            self._job = self.root.after(delay, self._tick)
+        except TclError:
+            self._job = None
+
+
 def moveSmooth(base_window, from_x, from_y, to_x, to_y,
                duration=1000, interval=10,
                overshoot=False, curve=False,
-               on_complete=None):
+               on_complete=None, easing=None):
     """
     Animate window from (from_x,from_y) → (to_x,to_y) over `duration` ms,
-    updating every `interval` ms.
+    updating every `interval` ms on the shared FrameClock.
       - overshoot=True  → use back-easing (shoot past & settle)
       - curve=True      → follow a quadratic Bézier arc
+      - easing="name"   → any curve from EASINGS (overrides overshoot)
+    Returns the Tween handle.
     """
-    dx, dy = to_x - from_x, to_y - from_y
-    start = time.time()
-
-    # standard ease-in-out
-    def ease_io(t):
-        return 0.5 * (1 - math.cos(math.pi * t))
-
-    # back-easing for overshoot
-    def ease_io_back(t, s=0.7):
-        s *= 1.525
-        if t < 0.5:
-            return ((2*t)**2 * ((s+1)*(2*t) - s)) / 2
-        p = 2*t - 2
-        return ((p**2 * ((s+1)*p + s) + 2)) / 2
-
-    # if curve=True, build a quadratic Bézier: P0→P1→P2
-    # P1 is midpoint shifted perpendicular by 0.2*length
-    if curve:
-        mid_x, mid_y = (from_x + to_x)/2, (from_y + to_y)/2
-        # perpendicular unit vector
-        length = math.hypot(dx, dy)
-        if length == 0:
-            ux, uy = 0, 0
-        else:
-            ux, uy = -dy/length, dx/length
-        # control point offset 20% of total distance
-        ctrl_x = mid_x + ux * (length * 0.2)
-        ctrl_y = mid_y + uy * (length * 0.2)
+    return moveMany([(base_window, [(from_x, from_y), (to_x, to_y)])],
+                    duration=duration, interval=interval,
+                    overshoot=overshoot, curve=curve,
+                    on_complete=on_complete, easing=easing)[0]
 
-    def _step():
-        now = time.time()
-        t_raw = (now - start) / (duration/1000)
-        t = min(max(t_raw, 0.0), 1.0)
-
-        # pick easing function
-        e = (ease_io_back(t) if overshoot else ease_io(t))
+def moveAlong(window, points, duration=1000, interval=10,
+              overshoot=False, curve=False, on_complete=None, easing=None):
+    """
+    Animate window through the waypoints [(x, y), ...] as one tween.
+    Each leg gets an equal share of the eased time. The first point should
+    be where the window is now.
+    """
+    return moveMany([(window, points)], duration=duration, interval=interval,
+                    overshoot=overshoot, curve=curve,
+                    on_complete=on_complete, easing=easing)[0]
 
-        if curve:
-            # quadratic Bézier at parameter e:
-            # B(e) = (1−e)^2 P0 + 2(1−e)e P1 + e^2 P2
-            inv = 1 - e
-            new_x = int(inv*inv*from_x + 2*inv*e*ctrl_x + e*e*to_x)
-            new_y = int(inv*inv*from_y + 2*inv*e*ctrl_y + e*e*to_y)
-        else:
-            # straight line interpolation
-            new_x = int(from_x + dx * e)
-            new_y = int(from_y + dy * e)
+def moveMany(moves, duration=1000, interval=10,
+             overshoot=False, curve=False, on_complete=None, easing=None):
+    """
+    Animate several windows together: `moves` is [(window, points), ...]
+    where every points list has the same length. The whole batch shares one
+    precomputed Trajectory. on_complete fires when the last window lands.
+    Returns the Tweens.
+    """
+    if not moves:
+        return []
+    clock = FrameClock.for_widget(moves[0][0])
+    return clock.start(moves, duration=duration, interval=interval,
+                       overshoot=overshoot, curve=curve, easing=easing,
+                       on_complete=on_complete)
 
-        setWindowPosition(new_x, new_y, base_window)
+def currentTween(window):
+    """Active Tween moving `window`, or None."""
+    return FrameClock.for_widget(window).tween_for(window)
 
-        if t < 1.0:
-            base_window.after(interval, _step)
-        elif on_complete:
-            on_complete()
+def currentPosition(window):
+    """Where `window` is: the last animated position, else ask the WM."""
+    tween = currentTween(window)
+    if tween is not None:
+        # mid-flight: no WM round-trip needed
+        return tween.x, tween.y
+    return window.winfo_x(), window.winfo_y()
 
-    _step()
+def cancelMove(window):
+    """Stop any animation on `window` without firing its callback."""
+    tween = currentTween(window)
+    if tween is not None:
+        tween.cancel()
 
 def moveWindowTo(window, x, y, **kwargs):
-    cx, cy = window.winfo_x(), window.winfo_y()
-    moveSmooth(window, cx, cy, x, y, **kwargs)
\ No newline at end of file
+    cx, cy = currentPosition(window)
+    return moveSmooth(window, cx, cy, x, y, **kwargs)
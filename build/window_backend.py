@@ -0,0 +1,302 @@
+import heapq, itertools, time
+from tkinter import Tk, Toplevel, Label, Button, Canvas, TclError
+import windowMove
+
+# Window backends used by KeyManager / LimboWindow.
+#   TkBackend       → real Tk windows (the game)
+#   HeadlessBackend → in-memory windows on a VirtualClock (CI, benchmarks)
+
+
+class TkBackend:
+    name = "tk"
+
+    def create_root(self):
+        return Tk()
+
+    def toplevel(self, master):
+        return Toplevel(master)
+
+    def label(self, parent, **kwargs):
+        return Label(parent, **kwargs)
+
+    def button(self, parent, **kwargs):
+        return Button(parent, **kwargs)
+
+    def canvas(self, parent, **kwargs):
+        return Canvas(parent, **kwargs)
+
+    def photo_image(self, image, master):
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(image, master=master)
+
+    def screen_size(self, root):
+        return root.winfo_screenwidth(), root.winfo_screenheight()
+
+
+class VirtualClock:
+    """
+    Simulated time for after() callbacks. run() fires callbacks in due
+    order and jumps straight to the next one, so animations play as fast
+    as the CPU allows.
+      - charge_callbacks=True → time also advances by the real time each
+        callback took, so slow frames show up as late timers
+    """
+
+    def __init__(self, charge_callbacks=False):
+        self.time = 0.0
+        self.charge_callbacks = charge_callbacks
+        self.fired = 0
+        self.lateness = []       # ms each callback fired after its due time
+        self._queue = []         # (due, seq, job, fn)
+        self._live = set()
+        self._cancelled = set()
+        self._seq = itertools.count()
+
+    def now(self):
+        return self.time
+
+    def after(self, ms, fn=None, *args):
+        seq = next(self._seq)
+        job = f"after#{seq}"
+        due = self.time + max(int(ms), 0) / 1000
+        heapq.heappush(self._queue, (due, seq, job, (lambda: fn(*args)) if args else fn))
+        self._live.add(job)
+        return job
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def after_cancel(self, job):
+        if job in self._live:
+            self._live.discard(job)
+            self._cancelled.add(job)
+
+    def pending(self):
+        return len(self._live)
+
+    def run(self, until=None, max_callbacks=None):
+        """Fire callbacks until the queue is empty (or `until` seconds)."""
+        count = 0
+        while self._queue:
+            due, _, job, fn = self._queue[0]
+            if until is not None and due > until:
+                self.time = max(self.time, until)
+                break
+            heapq.heappop(self._queue)
+            if job in self._cancelled:
+                self._cancelled.discard(job)
+                continue
+            self._live.discard(job)
+            if due > self.time:
+                self.time = due
+            elif self.charge_callbacks:
+                self.lateness.append((self.time - due) * 1000)
+
+            started = time.perf_counter()
+            fn()
+            if self.charge_callbacks:
+                self.time += time.perf_counter() - started
+
+            self.fired += 1
+            count += 1
+            if max_callbacks is not None and count >= max_callbacks:
+                break
+        return count
+
+
+class HeadlessWidget:
+    def __init__(self, backend, master):
+        self.backend = backend
+        self.master = master
+        self._destroyed = False
+
+    def _root(self):
+        return self.master._root()
+
+    def _check(self):
+        if self._destroyed:
+            raise TclError("bad window path name")
+
+    def after(self, ms, fn=None, *args):
+        return self.backend.clock.after(ms, fn, *args)
+
+    def after_idle(self, fn, *args):
+        return self.backend.clock.after_idle(fn, *args)
+
+    def after_cancel(self, job):
+        self.backend.clock.after_cancel(job)
+
+    def winfo_exists(self):
+        return not self._destroyed
+
+    def config(self, **kwargs):
+        self._check()
+        if "image" in kwargs:
+            self.image = kwargs["image"]
+            self.backend.image_updates += 1
+
+    configure = config
+
+    def place(self, **kwargs):
+        pass
+
+    def pack(self, **kwargs):
+        pass
+
+    def destroy(self):
+        self._destroyed = True
+
+
+class HeadlessWindow(HeadlessWidget):
+    """In-memory stand-in for Tk / Toplevel. Records position updates."""
+
+    def __init__(self, backend, master=None):
+        super().__init__(backend, master)
+        self.x = self.y = 0
+        self.width = self.height = 1
+        self.visible = True
+
+    def _root(self):
+        return self.master._root() if self.master is not None else self
+
+    def geometry(self, spec=None):
+        self._check()
+        if spec is None:
+            return f"{self.width}x{self.height}+{self.x}+{self.y}"
+        size, _, pos = spec.partition("+")
+        if size:
+            self.width, self.height = (int(v) for v in size.split("x"))
+        if pos:
+            x, y = pos.split("+")
+            self.x, self.y = int(x), int(y)
+            self.backend.geometry_calls += 1
+            if self.backend.record:
+                self.backend.events.append((self.backend.clock.time, id(self), self.x, self.y))
+
+    def winfo_x(self):
+        self._check()
+        return self.x
+
+    def winfo_y(self):
+        self._check()
+        return self.y
+
+    def winfo_screenwidth(self):
+        return self.backend.screen[0]
+
+    def winfo_screenheight(self):
+        return self.backend.screen[1]
+
+    def title(self, text=None):
+        pass
+
+    def resizable(self, *args):
+        pass
+
+    def wm_attributes(self, *args):
+        pass
+
+    def overrideredirect(self, flag=None):
+        pass
+
+    def protocol(self, name, fn=None):
+        pass
+
+    def withdraw(self):
+        self.visible = False
+
+    def deiconify(self):
+        self.visible = True
+
+    def lift(self):
+        pass
+
+    def destroy(self):
+        super().destroy()
+        if self.master is None:
+            windowMove.FrameClock.release(self)
+
+    def update_idletasks(self):
+        pass
+
+    def mainloop(self):
+        self.backend.clock.run()
+
+
+class HeadlessCanvas(HeadlessWidget):
+    """In-memory Canvas holding image items. Counts coordinate updates."""
+
+    def __init__(self, backend, master):
+        super().__init__(backend, master)
+        self.items = {}         # item -> {"x", "y", "image", "state"}
+        self._ids = itertools.count(1)
+
+    def create_image(self, x, y, **kwargs):
+        self._check()
+        item = next(self._ids)
+        self.items[item] = dict(kwargs, x=x, y=y)
+        return item
+
+    def coords(self, item, x, y):
+        self._check()
+        self.items[item].update(x=x, y=y)
+        self.backend.canvas_updates += 1
+        if self.backend.record:
+            self.backend.events.append((self.backend.clock.time, item, x, y))
+
+    def itemconfig(self, item, **kwargs):
+        self._check()
+        self.items[item].update(kwargs)
+        if "image" in kwargs:
+            self.backend.image_updates += 1
+
+    def tag_raise(self, item):
+        self.items[item] = self.items.pop(item)
+
+    def delete(self, item):
+        self.items.pop(item, None)
+
+
+class HeadlessBackend:
+    """
+    Tk-free backend: windows are plain objects, timers run on a
+    VirtualClock and every geometry / canvas / image update is counted.
+      - record=True → also keep (time, window or item, x, y) for each move
+    """
+    name = "headless"
+
+    def __init__(self, screen_size=(1920, 1080), clock=None, record=False):
+        self.screen = screen_size
+        self.clock = clock or VirtualClock()
+        self.record = record
+        self.events = []
+        self.geometry_calls = 0
+        self.canvas_updates = 0
+        self.image_updates = 0
+
+    def create_root(self):
+        root = HeadlessWindow(self)
+        # animations on this root run on simulated time
+        windowMove.FrameClock.install(root, now=self.clock.now)
+        return root
+
+    def toplevel(self, master):
+        return HeadlessWindow(self, master)
+
+    def label(self, parent, **kwargs):
+        label = HeadlessWidget(self, parent)
+        label.config(**kwargs)
+        return label
+
+    def button(self, parent, **kwargs):
+        return HeadlessWidget(self, parent)
+
+    def canvas(self, parent, **kwargs):
+        return HeadlessCanvas(self, parent)
+
+    def photo_image(self, image, master):
+        # nothing to upload anywhere: the blended PIL image is the frame
+        return image
+
+    def screen_size(self, root):
+        return self.screen